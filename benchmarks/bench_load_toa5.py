@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+bench_load_toa5.py
+
+Benchmark: loading a TOA5 file with the per-line split(",") + strptime
+loop the scripts use, against toa5.reader.load_toa5, both for just the
+timestamps and for every field.
+
+The sample file's rows are repeated into a temporary file of --rows rows.
+
+Usage:
+  python benchmarks/bench_load_toa5.py
+  python benchmarks/bench_load_toa5.py --file "E:/MERGE/Nkeyema/Nkeyema_Secondary_SYNOP.dat" --rows 500000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from toa5.reader import load_toa5, read_header
+
+DEFAULT_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "kalene_local", "Kalene_Secondary_SYNOP.dat.backup",
+)
+
+TS_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+]
+
+HEADER_LINES = 4
+
+
+def parse_ts(text):
+    text = text.strip().strip('"')
+    for fmt in TS_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def to_float(text):
+    try:
+        return float(text.strip('"'))
+    except ValueError:
+        return text
+
+
+def load_per_line(path, all_fields=True):
+    # the scripts' approach: one split and one strptime per row
+    rows = []
+    with open(path, "r", errors="ignore") as f:
+        lines = f.readlines()[HEADER_LINES:]
+    for ln in lines:
+        if not ln.strip():
+            continue
+        parts = ln.rstrip("\n").split(",")
+        if all_fields:
+            rows.append([parse_ts(parts[0])] + [to_float(p) for p in parts[1:]])
+        else:
+            rows.append(parse_ts(parts[0]))
+    return rows
+
+
+def make_file(src, n_rows, folder):
+    with open(src, "r", errors="ignore") as f:
+        lines = f.readlines()
+    header, body = lines[:HEADER_LINES], [ln for ln in lines[HEADER_LINES:] if ln.strip()]
+    body = (body * (n_rows // len(body) + 1))[:n_rows]
+
+    path = os.path.join(folder, "bench_" + os.path.basename(src).replace(".backup", ""))
+    with open(path, "w") as f:
+        f.writelines(header)
+        f.writelines(body)
+    return path
+
+
+def bench(label, fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    print(f"  {label:<44} {best:>8.3f} s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default=DEFAULT_FILE, help="TOA5 .dat file to take rows from")
+    parser.add_argument("--rows", type=int, default=500_000, help="Rows in the generated file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_file(args.file, args.rows, tmp)
+        fields = read_header(path).fields
+        some = fields[:1] + fields[-2:]
+
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"\nLoading {args.rows:,} rows x {len(fields)} fields ({size_mb:.1f} MB)\n")
+
+        ts_before = bench("before: per-line, TIMESTAMP only", lambda: load_per_line(path, False), args.repeat)
+        ts_after = bench("after: load_toa5, TIMESTAMP only", lambda: load_toa5(path, ["TIMESTAMP"]), args.repeat)
+        proj = bench(f"after: load_toa5, {len(some)} columns", lambda: load_toa5(path, some), args.repeat)
+        print()
+        before = bench("before: per-line, every field", lambda: load_per_line(path), args.repeat)
+        full = bench("after: load_toa5, every field", lambda: load_toa5(path), args.repeat)
+
+    print(f"\n  Speed-up: {ts_before / ts_after:.1f}x (TIMESTAMP only), {before / full:.1f}x (every field)")
+
+
+if __name__ == "__main__":
+    main()
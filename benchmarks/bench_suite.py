@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+bench_suite.py
+
+Times the hot paths on a synthetic (or given) station folder and reports
+throughput per stage: rows/s, MB/s and peak RSS.
+
+Stages:
+  parse   TimestampParser over the first field of every row
+  scan    full ScanCache scan of every file (first/last/rows), no cache hits
+  tail    first + last timestamp of every file via the head read and tail seek
+  pair    find_table_groups + split_pair on the folder
+  merge   merge_group of every table into a temporary folder
+  load    load_toa5 of every file, all columns
+
+Each stage runs in its own process, so its peak RSS is its own.
+With --json the results are saved; with --baseline an earlier --json file
+is compared against, to make regressions visible.
+
+Usage:
+  python benchmarks/bench_suite.py --rows 200000
+  python benchmarks/bench_suite.py --mb 500 --tables SYNOP Table10m --json bench.json
+  python benchmarks/bench_suite.py --data "E:/MERGE/Nkeyema" --stages scan merge --baseline bench.json
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from toa5.metrics import peak_rss_mb
+from toa5.tables import FREQ_MAP, TS_FORMATS
+
+STAGES = ("parse", "scan", "tail", "pair", "merge", "load")
+PAIR_REPEAT = 200
+
+
+def dat_files(folder):
+    return [os.path.join(folder, n) for n in sorted(os.listdir(folder)) if n.endswith(".dat")]
+
+
+def stage_parse(folder, tmp):
+    from toa5.ts_parser import TimestampParser
+
+    rows = nbytes = 0
+    for path in dat_files(folder):
+        parse = TimestampParser(TS_FORMATS)
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for ln in f:
+                if parse(ln.split(",", 1)[0]) is not None:
+                    rows += 1
+        nbytes += os.path.getsize(path)
+    return rows, nbytes
+
+
+def stage_scan(folder, tmp):
+    from toa5.scan_cache import ScanCache
+
+    rows = nbytes = 0
+    with ScanCache(folder, db_path=":memory:") as cache:
+        for path in dat_files(folder):
+            rows += cache.scan(path).rows
+            nbytes += os.path.getsize(path)
+    return rows, nbytes
+
+
+def stage_tail(folder, tmp):
+    from toa5.dat_io import find_first_timestamp, find_last_timestamp
+    from toa5.tables import parse_ts
+
+    files = dat_files(folder)
+    for path in files:
+        find_first_timestamp(path, parse_ts)
+        find_last_timestamp(path, parse_ts)
+    # rows here are files: each needs two timestamps, whatever its size
+    return len(files), 0
+
+
+def stage_pair(folder, tmp):
+    from toa5.merge import find_table_groups, split_pair
+
+    groups = 0
+    for _ in range(PAIR_REPEAT):
+        for _, files in find_table_groups(folder):
+            split_pair(files)
+            groups += 1
+    return groups, 0
+
+
+def stage_merge(folder, tmp):
+    from toa5.merge import find_table_groups, merge_group
+
+    out = os.path.join(tmp, "merged")
+    rows = nbytes = 0
+    with redirect_stdout(io.StringIO()):
+        for suf, files in find_table_groups(folder):
+            merge_group(suf, files, out, False, "prefer-b")
+            nbytes += sum(os.path.getsize(f) for f in files)
+    for path in dat_files(out) if os.path.isdir(out) else []:
+        with open(path, "rb") as f:
+            rows += sum(1 for _ in f) - 4
+    shutil.rmtree(out, ignore_errors=True)
+    return rows, nbytes
+
+
+def stage_load(folder, tmp):
+    from toa5.reader import load_toa5
+
+    rows = nbytes = 0
+    for path in dat_files(folder):
+        rows += len(load_toa5(path))
+        nbytes += os.path.getsize(path)
+    return rows, nbytes
+
+
+STAGE_FUNCS = {
+    "parse": stage_parse,
+    "scan": stage_scan,
+    "tail": stage_tail,
+    "pair": stage_pair,
+    "merge": stage_merge,
+    "load": stage_load,
+}
+
+# what "rows" counts for the stages where it isn't data rows
+UNITS = {"tail": "files", "pair": "groups"}
+
+
+def run_stage(stage, folder, tmp):
+    """Run one stage; called in a fresh worker process."""
+    t0 = time.perf_counter()
+    rows, nbytes = STAGE_FUNCS[stage](folder, tmp)
+    seconds = time.perf_counter() - t0
+    return {
+        "stage": stage,
+        "seconds": seconds,
+        "rows": rows,
+        "bytes": nbytes,
+        "rows_per_s": rows / seconds if seconds else None,
+        "mb_per_s": nbytes / 1e6 / seconds if seconds and nbytes else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def print_results(results, baseline=None):
+    base = {r["stage"]: r for r in (baseline or {}).get("results", [])}
+
+    print(f"\n  {'stage':<7} {'seconds':>9} {'rows/s':>14} {'MB/s':>9} {'peak RSS MB':>12}  {'vs baseline':>11}")
+    for r in results:
+        change = ""
+        old = base.get(r["stage"])
+        if old and old.get("rows_per_s") and r["rows_per_s"]:
+            change = f"{(r['rows_per_s'] / old['rows_per_s'] - 1) * 100:+.1f}%"
+        unit = UNITS.get(r["stage"], "")
+        print(
+            f"  {r['stage']:<7} {r['seconds']:>9.3f} {fmt(r['rows_per_s'], ',.0f'):>14} "
+            f"{fmt(r['mb_per_s'], '.1f'):>9} {fmt(r['peak_rss_mb'], '.1f'):>12}  {change:>11}"
+            + (f"  ({unit}/s)" if unit else "")
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scan/parse/pair/merge/load on TOA5 data")
+    parser.add_argument("--data", help="Existing station folder to benchmark (default: generate one)")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows per table for the generated data")
+    parser.add_argument("--mb", type=float, help="Approximate MB per table for the generated data, instead of --rows")
+    parser.add_argument("--tables", nargs="+", choices=list(FREQ_MAP), default=list(FREQ_MAP))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Earlier --json results to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    tmp = tempfile.mkdtemp(prefix="toa5_bench_")
+    try:
+        folder = args.data
+        if not folder:
+            from make_toa5 import main as make_main
+
+            folder = os.path.join(tmp, "Synth")
+            size = ["--mb", str(args.mb)] if args.mb else ["--rows", str(args.rows)]
+            print("Generating data:")
+            make_main(["--out", folder, "--tables", *args.tables, *size])
+
+        files = dat_files(folder)
+        total_mb = sum(os.path.getsize(p) for p in files) / 1e6
+        print(f"\nBenchmarking {len(files)} files, {total_mb:.1f} MB in {folder}")
+
+        results = []
+        for stage in args.stages:
+            # a fresh process per stage, so peak RSS isn't inherited from earlier stages
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                results.append(pool.submit(run_stage, stage, folder, tmp).result())
+            print(f"  {stage} done in {results[-1]['seconds']:.2f} s")
+
+        print_results(results, baseline)
+
+        if args.json:
+            report = {
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "data": folder if args.data else f"generated: {args.tables}, "
+                        + (f"{args.mb} MB" if args.mb else f"{args.rows} rows") + " per table",
+                "files": len(files),
+                "megabytes": total_mb,
+                "results": results,
+            }
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\n✅ Results → {args.json}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+bench_ts_parse.py
+
+Microbenchmark: rows/sec for timestamp parsing of .dat rows, comparing the
+per-row strptime loop used by parse_ts with the learned-layout
+TimestampParser.
+
+Usage:
+  python benchmarks/bench_ts_parse.py
+  python benchmarks/bench_ts_parse.py --file "E:/MERGE/Nkeyema/Nkeyema_Secondary_Table10m.dat" --rows 500000
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from toa5.ts_parser import TimestampParser
+
+DEFAULT_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "kalene_local", "Kalene_Secondary_SYNOP.dat.backup",
+)
+
+TS_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+]
+
+
+def parse_ts(text):
+    # the original per-row parser, for the "before" numbers
+    text = text.strip().strip('"')
+    for fmt in TS_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def load_rows(path, n_rows, header_lines=4):
+    with open(path, "r", errors="ignore") as f:
+        rows = [ln for ln in f.readlines()[header_lines:] if ln.strip()]
+    if not rows:
+        raise SystemExit(f"No data rows in {path}")
+    return (rows * (n_rows // len(rows) + 1))[:n_rows]
+
+
+def bench(label, rows, check, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for ln in rows:
+            check(ln)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    rate = len(rows) / best
+    print(f"  {label:<42} {rate:>12,.0f} rows/s  ({best:.3f} s)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default=DEFAULT_FILE, help="TOA5 .dat file to take rows from")
+    parser.add_argument("--rows", type=int, default=200_000, help="Number of rows to parse")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    rows = load_rows(args.file, args.rows)
+    print(f"\nParsing {len(rows):,} rows from {os.path.basename(args.file)}\n")
+
+    before = bench(
+        "before: split(',') + parse_ts (strptime)",
+        rows, lambda ln: parse_ts(ln.split(",")[0]), args.repeat,
+    )
+    bench(
+        "split(',', 1) + parse_ts (strptime)",
+        rows, lambda ln: parse_ts(ln.split(",", 1)[0]), args.repeat,
+    )
+
+    fast = TimestampParser(TS_FORMATS)
+    after = bench(
+        "after: split(',', 1) + TimestampParser",
+        rows, lambda ln: fast(ln.split(",", 1)[0]), args.repeat,
+    )
+
+    print(f"\n  Speed-up: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
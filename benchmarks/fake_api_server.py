@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+fake_api_server.py
+
+Local stand-in for the station file API, for trying out and timing
+the downloader (python -m toa5 download) without the real server.
+
+Serves every file in --root:
+  GET /api/files             -> {"files": [{"name": ..., "size": ..., "mtime": ...}, ...]}
+  GET /api/download/<name>   -> the file bytes (honours "Range: bytes=N-" / "bytes=N-M")
+
+Usage:
+  python benchmarks/fake_api_server.py --root "E:/MERGE/Kalene" --port 3000
+  python -m toa5 download Kalene out --api http://127.0.0.1:3000/api --jobs 8
+"""
+
+import os
+import json
+import argparse
+from urllib.parse import unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    root = "."
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/api/files":
+            self.send_listing()
+        elif self.path.startswith("/api/download/"):
+            self.send_file(unquote(self.path[len("/api/download/"):]))
+        else:
+            self.send_error(404)
+
+    def send_listing(self):
+        files = []
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if os.path.isfile(path):
+                st = os.stat(path)
+                files.append({"name": name, "size": st.st_size, "mtime": int(st.st_mtime)})
+
+        body = json.dumps({"files": files}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_file(self, name):
+        path = os.path.join(self.root, os.path.basename(name))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+
+        rng = self.headers.get("Range")
+        if rng and rng.startswith("bytes="):
+            first, _, last = rng[len("bytes="):].partition("-")
+            start = int(first) if first else 0
+            end = min(int(last), size - 1) if last else size - 1
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", required=True, help="Folder whose files are served")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    args = parser.parse_args()
+
+    ApiHandler.root = args.root
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    print(f"Serving {args.root} on http://{args.host}:{args.port}/api")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+make_toa5.py
+
+Synthetic TOA5 station folders for benchmarking and trying out the tools.
+
+For every table type in FREQ_MAP (or the ones given with --tables) this
+writes a <Station>_ZMD_<table>.dat and a <Station>_Secondary_<table>.dat
+that continue each other, like a real download before a merge. Gaps inside
+the files, an overlap between ZMD and Secondary, duplicated rows and a
+changed Secondary header can be injected on request.
+
+Row values are drawn once into a pool of row tails and then cycled, so
+generating GB-sized files is limited by disk speed, not by Python.
+
+Usage:
+  python benchmarks/make_toa5.py --out data/Synth --rows 1000000
+  python benchmarks/make_toa5.py --out data/Synth --mb 2000 --tables SYNOP
+  python benchmarks/make_toa5.py --out data/Synth --rows 50000 --gaps 5 --overlap 24 --duplicates 3 --header-variant no-seconds
+"""
+
+import os
+import sys
+import random
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from toa5.tables import FREQ_MAP
+
+START = datetime(2024, 1, 1)
+POOL_SIZE = 1000
+WRITE_ROWS = 10_000
+
+HEADER_VARIANTS = ("none", "program", "no-seconds", "extra-field")
+
+# table -> [(field, unit, processing, low, high)]; RECORD and TIMESTAMP come first in every table
+TABLE_FIELDS = {
+    "TableDay": [
+        ("BattV_Min", "Volts", "Min", 11.8, 13.2),
+        ("PTemp_C_Avg", "Deg C", "Avg", 10, 45),
+        ("AirTC_Max", "Deg C", "Max", 20, 38),
+        ("AirTC_Min", "Deg C", "Min", 5, 22),
+        ("RH_Max", "%", "Max", 60, 100),
+        ("RH_Min", "%", "Min", 10, 60),
+        ("Rain_mm_Tot", "mm", "Tot", 0, 40),
+        ("SlrMJ_Tot", "MJ/m^2", "Tot", 5, 30),
+        ("WS_ms_Max", "meters/second", "Max", 2, 20),
+    ],
+    "TableETHour": [
+        ("ETos", "mm", "ETXs", 0, 1),
+        ("Rso", "MJ/m^2", "Rso", 0, 4),
+        ("AirTC_Avg", "Deg C", "Avg", 8, 36),
+        ("RH", "%", "Smp", 10, 100),
+        ("WS_ms_Avg", "meters/second", "Avg", 0, 12),
+        ("SlrMJ_Tot", "MJ/m^2", "Tot", 0, 4),
+    ],
+    "TableHour": [
+        ("AirTC_Avg", "Deg C", "Avg", 8, 36),
+        ("RH", "%", "Smp", 10, 100),
+        ("BP_mbar", "mbar", "Smp", 850, 900),
+        ("Rain_mm_Tot", "mm", "Tot", 0, 10),
+        ("WS_ms_S_WVT", "meters/second", "WVc", 0, 12),
+        ("WindDir_D1_WVT", "Deg", "WVc", 0, 360),
+        ("SlrW_Avg", "W/m^2", "Avg", 0, 1100),
+    ],
+    "SYNOP": [
+        ("BP", "Pa", "Smp", 85000, 90000),
+        ("QNH", "Pa", "Smp", 100000, 103000),
+        ("AirTempK", "K", "Smp", 280, 310),
+        ("DewPointTempK", "K", "Smp", 270, 300),
+        ("RH", "%", "Smp", 10, 100),
+        ("Rain_mm_Tot", "mm", "Tot", 0, 10),
+        ("WSpeed", "m/s", "Smp", 0, 12),
+        ("WindDir", "Deg", "Smp", 0, 360),
+        ("WindGust", "m/s", "Smp", 0, 25),
+        ("SlrJ", "J/m^2", "Tot", 0, 4e6),
+    ],
+    "Table10m": [
+        ("AirTC_Avg", "Deg C", "Avg", 8, 36),
+        ("RH", "%", "Smp", 10, 100),
+        ("WS_ms_Avg", "meters/second", "Avg", 0, 12),
+        ("WindDir", "Deg", "Smp", 0, 360),
+        ("Rain_mm_Tot", "mm", "Tot", 0, 5),
+        ("SlrW_Avg", "W/m^2", "Avg", 0, 1100),
+        ("BP_mbar_Avg", "mbar", "Avg", 850, 900),
+    ],
+    "TableSolarCharger10m": [
+        ("BattV_Avg", "Volts", "Avg", 11.8, 14.4),
+        ("ChgI_Avg", "Amps", "Avg", 0, 5),
+        ("LoadI_Avg", "Amps", "Avg", 0, 1),
+        ("PanelV_Avg", "Volts", "Avg", 0, 21),
+        ("ChgState", "", "Smp", 0, 4),
+    ],
+}
+
+# the field added to the Secondary file by --header-variant extra-field
+EXTRA_FIELD = ("BattV_Avg2", "Volts", "Avg", 11.8, 13.2)
+
+
+def quoted(values):
+    return ",".join(f'"{v}"' for v in values)
+
+
+def header_lines(station, role, table, fields, variant):
+    program = "ZMD_J5580_V1R0_20230313"
+    if role == "Secondary" and variant == "program":
+        program = "ZMD_J5580_V1R1_20240601"
+    env = ["TOA5", f"{station}_{role}", "CR1000X", "49618", "CR1000X.Std.06.02",
+           f"CPU:{program}.cr1x", "56559", table]
+    return [
+        quoted(env),
+        quoted(["TIMESTAMP", "RECORD"] + [f[0] for f in fields]),
+        quoted(["TS", "RN"] + [f[1] for f in fields]),
+        quoted(["", ""] + [f[2] for f in fields]),
+    ]
+
+
+def tail_pool(fields, rng, nan_rate):
+    """POOL_SIZE ready-made ',v1,v2,...' row tails."""
+    pool = []
+    for _ in range(POOL_SIZE):
+        parts = []
+        for _, _, _, low, high in fields:
+            if rng.random() < nan_rate:
+                parts.append('"NAN"')
+            else:
+                parts.append(f"{rng.uniform(low, high):.4g}")
+        pool.append("," + ",".join(parts))
+    return pool
+
+
+def plan_rows(rows, split, overlap, gaps, duplicates, rng):
+    """
+    Return (zmd_indices, secondary_indices): the interval numbers each file
+    holds. Gaps are kept away from the ZMD/Secondary boundary so that the
+    pair still lines up for a merge (unless an overlap was asked for).
+    """
+    skipped = set()
+    guard = overlap + 50
+    for _ in range(gaps):
+        start = rng.randrange(rows)
+        if abs(start - split) < guard:
+            continue
+        skipped.update(range(start, min(rows, start + rng.randint(1, 20))))
+
+    repeated = set(rng.sample(range(rows), min(duplicates, rows)))
+
+    def indices(lo, hi):
+        for i in range(lo, hi):
+            if i in skipped:
+                continue
+            yield i
+            if i in repeated:
+                yield i
+
+    return indices(0, split), indices(max(0, split - overlap), rows)
+
+
+def write_file(path, header, indices, delta, pool, no_seconds=False):
+    """Write one .dat file; returns (rows, bytes)."""
+    n = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(header) + "\n")
+        buf = []
+        for i in indices:
+            ts = (START + i * delta).isoformat(sep=" ")
+            if no_seconds:
+                ts = ts[:16]
+            buf.append(f'"{ts}",{i}{pool[i % POOL_SIZE]}')
+            if len(buf) == WRITE_ROWS:
+                f.write("\n".join(buf) + "\n")
+                n += len(buf)
+                buf = []
+        if buf:
+            f.write("\n".join(buf) + "\n")
+            n += len(buf)
+    return n, os.path.getsize(path)
+
+
+def rows_for_mb(mb, fields):
+    # about 25 bytes of timestamp/record plus ~7 per value
+    return int(mb * 1e6 / (25 + 7 * len(fields)))
+
+
+def make_table(out, station, table, rows, args, rng):
+    fields = TABLE_FIELDS[table]
+    sec_fields = fields + [EXTRA_FIELD] if args.header_variant == "extra-field" else fields
+
+    split = rows // 2
+    zmd_idx, sec_idx = plan_rows(rows, split, args.overlap, args.gaps, args.duplicates, rng)
+    delta = FREQ_MAP[table]
+
+    results = []
+    for role, idx, flds in (("ZMD", zmd_idx, fields), ("Secondary", sec_idx, sec_fields)):
+        path = os.path.join(out, f"{station}_{role}_{table}.dat")
+        header = header_lines(station, role, table, flds, args.header_variant)
+        pool = tail_pool(flds, rng, args.nan_rate)
+        no_seconds = role == "Secondary" and args.header_variant == "no-seconds"
+        n, size = write_file(path, header, idx, delta, pool, no_seconds)
+        results.append((path, n, size))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic TOA5 station files")
+    parser.add_argument("--out", required=True, help="Station folder to create (its name is the station name)")
+    parser.add_argument("--tables", nargs="+", choices=list(FREQ_MAP), default=list(FREQ_MAP))
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--rows", type=int, default=10_000, help="Rows per table, ZMD + Secondary (default 10000)")
+    size.add_argument("--mb", type=float, help="Approximate size per table in MB, instead of --rows")
+    parser.add_argument("--gaps", type=int, default=0, help="Gaps of 1-20 missing rows to cut into the files")
+    parser.add_argument("--overlap", type=int, default=0, help="Rows at the end of ZMD repeated at the start of Secondary")
+    parser.add_argument("--duplicates", type=int, default=0, help="Rows written twice")
+    parser.add_argument("--header-variant", choices=HEADER_VARIANTS, default="none",
+                        help="How the Secondary header differs from ZMD: logger program, "
+                             "timestamps without seconds, or one extra field")
+    parser.add_argument("--nan-rate", type=float, default=0.002, help="Share of values written as NAN")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    station = os.path.basename(os.path.normpath(args.out))
+    os.makedirs(args.out, exist_ok=True)
+
+    total_rows = total_bytes = 0
+    for table in args.tables:
+        rows = rows_for_mb(args.mb, TABLE_FIELDS[table]) if args.mb else args.rows
+        for path, n, size in make_table(args.out, station, table, rows, args, rng):
+            print(f"  {os.path.basename(path):<44} {n:>10,} rows  {size / 1e6:>9.1f} MB")
+            total_rows += n
+            total_bytes += size
+
+    print(f"\n✅ {total_rows:,} rows, {total_bytes / 1e6:.1f} MB → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -261,20 +261,16 @@ import os
 import re
 import argparse
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
-logging.basicConfig(level=logging.INFO, format="%(message)s")
+from toa5 import dat_io
+from toa5.catalog import Catalog
+from toa5.compress import open_dat
+from toa5.interval import table_interval
+from toa5.ts_parser import TimestampParser
 
-# Expected frequencies (suffix -> timedelta)
-FREQ_MAP = {
-    "TableDay": timedelta(days=1),
-    "TableETHour": timedelta(hours=1),
-    "TableHour": timedelta(hours=1),
-    "SYNOP": timedelta(hours=1),
-    "TableSolarCharger10m": timedelta(minutes=10),
-    "Table10m": timedelta(minutes=10),
-}
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 # Timestamp regex: match "M/D/YYYY H:MM" or "MM/DD/YYYY HH:MM" optionally with seconds
 TS_REGEX = re.compile(r"^\s*(\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}(?::\d{2})?)")
@@ -284,11 +280,6 @@ TS_FORMATS = ("%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%d/%m
 
 
 # ---------- helpers ----------
-def read_lines(path):
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.readlines()
-
-
 def try_parse_ts(txt):
     """Return datetime or raise ValueError."""
     for fmt in TS_FORMATS:
@@ -300,145 +291,195 @@ def try_parse_ts(txt):
     raise ValueError(f"Unknown timestamp format: {txt!r}")
 
 
-def find_first_data_index(lines):
-    """Return index of first timestamped line, else None."""
-    for i, ln in enumerate(lines):
-        if TS_REGEX.match(ln):
-            # verify parseable
-            m = TS_REGEX.match(ln)
-            ts_str = m.group(1)
-            try:
-                try_parse_ts(ts_str)
-                return i
-            except ValueError:
-                continue
-    return None
-
-
-def get_first_last_ts_from_lines(lines):
+def row_timestamp(ln, parser=None):
     """
-    Return tuple: (first_data_index, first_ts (datetime), last_ts (datetime), data_lines_list)
-    If no data rows found, returns (None, None, None, []).
+    Return the datetime a data row starts with, or None for header/invalid lines.
+    parser is an optional per-file TimestampParser; without one every format
+    is tried with strptime.
     """
-    idx = find_first_data_index(lines)
-    if idx is None:
-        return None, None, None, []
+    m = TS_REGEX.match(ln)
+    if not m:
+        return None
+    if parser is not None:
+        return parser(m.group(1))
+    try:
+        return try_parse_ts(m.group(1))
+    except ValueError:
+        return None
 
-    data_lines = [ln.rstrip("\n") for ln in lines[idx:] if ln.strip() != ""]
-    # first ts
-    m = TS_REGEX.match(data_lines[0])
-    first_ts = try_parse_ts(m.group(1)) if m else None
 
-    # last ts
-    last_ts = None
-    for ln in reversed(data_lines):
-        m = TS_REGEX.match(ln)
-        if m:
-            try:
-                last_ts = try_parse_ts(m.group(1))
+def data_row_check(parser):
+    return lambda ln: row_timestamp(ln, parser) is not None
+
+
+def get_first_last_ts(path):
+    """
+    Return tuple: (first_ts (datetime), last_ts (datetime)) of the data rows.
+    The head is streamed and the tail read backwards, so the file is never
+    loaded whole. If no data rows are found, returns (None, None).
+    """
+    first_ts = None
+    with open_dat(path) as f:
+        for ln in f:
+            first_ts = row_timestamp(ln)
+            if first_ts:
                 break
-            except ValueError:
-                continue
 
-    return idx, first_ts, last_ts, data_lines
+    if first_ts is None:
+        return None, None
 
+    last_ts = None
+    for ln in dat_io.iter_lines_reverse(path):
+        last_ts = row_timestamp(ln)
+        if last_ts:
+            break
 
-def get_suffix_from_name(name):
-    base = os.path.basename(name)
-    for suf in FREQ_MAP.keys():
-        if suf in base:
-            return suf
-    return None
+    return first_ts, last_ts
 
 
 # ---------- pairing ----------
 def pair_files_in_folder(src_folder):
     """
-    Pair by suffix. For each suffix in FREQ_MAP we look for a ZMD file and a SECONDARY file.
-    Returns list of (zmd_path, secondary_path).
+    Group by station and table (each name parsed once, see toa5/catalog.py) and
+    collect the ZMD and other-role (e.g. SECONDARY) files of each.
+    Returns list of (kind, files): ("pair", [zmd_path, secondary_path]) for an
+    ordinary pair, or ("fragments", files) when a table was downloaded in
+    several fragments.
     """
-    all_files = [
-        os.path.join(src_folder, f)
-        for f in os.listdir(src_folder)
-        if f.lower().endswith(".dat") and os.path.isfile(os.path.join(src_folder, f))
-    ]
+    catalog = Catalog.from_folder(src_folder)
+    for name in catalog.unknown:
+        logging.warning(f"⚠ Unrecognised file name, not merged: {name}")
 
     pairs = []
-    for suf in FREQ_MAP.keys():
-        zmd = None
-        sec = None
-        for f in all_files:
-            fn = os.path.basename(f).upper()
-            if suf.upper() in fn:
-                if "ZMD" in fn:
-                    zmd = f
-                elif "SECONDARY" in fn:
-                    sec = f
-        if zmd and sec:
-            pairs.append((zmd, sec))
+    for suf, entries in catalog.table_groups():
+        zmd = [os.path.join(src_folder, e.name) for e in entries if e.role == "ZMD"]
+        sec = [os.path.join(src_folder, e.name) for e in entries if e.role != "ZMD"]
+        if len(zmd) == 1 and len(sec) == 1:
+            pairs.append(("pair", [zmd[0], sec[0]]))
+        elif len(zmd) + len(sec) >= 2:
+            pairs.append(("fragments", zmd + sec))
+        else:
+            logging.warning(f"⚠ No other {entries[0].station} {suf} file to merge with, not merged: {entries[0].name}")
     return pairs
 
 
 # ---------- merge logic ----------
-def merge_pair(zmd_file, sec_file, dst_folder, dry_run=False):
+def merge_pair(zmd_file, sec_file, dst_folder, dry_run=False, overlap="skip"):
     logging.info(f"\nChecking pair:\n  A: {zmd_file}\n  B: {sec_file}")
 
-    lines_a = read_lines(zmd_file)
-    lines_b = read_lines(sec_file)
+    first_a, last_a = get_first_last_ts(zmd_file)
+    first_b, last_b = get_first_last_ts(sec_file)
 
-    idx_a, first_a, last_a, data_a = get_first_last_ts_from_lines(lines_a)
-    idx_b, first_b, last_b, data_b = get_first_last_ts_from_lines(lines_b)
-
-    if idx_a is None:
+    if first_a is None:
         logging.warning(f"  ❌ No data rows found in {os.path.basename(zmd_file)} — skipping.")
         return False
-    if idx_b is None:
+    if first_b is None:
         logging.warning(f"  ❌ No data rows found in {os.path.basename(sec_file)} — skipping.")
         return False
 
-    suffix = get_suffix_from_name(sec_file)
-    if suffix is None or suffix not in FREQ_MAP:
-        logging.warning(f"  ⚠ Unknown or missing suffix for {os.path.basename(sec_file)} — skipping.")
+    # FREQ_MAP for the known tables, otherwise inferred from the first/last rows
+    delta, source = table_interval([zmd_file, sec_file], make_row_reader)
+    if delta is None:
+        logging.warning(f"  ⚠ Cannot tell the interval of {os.path.basename(sec_file)} ({source}) — skipping.")
         return False
+    if source != "table type":
+        logging.info(f"  Interval: {delta} ({source})")
 
-    delta = FREQ_MAP[suffix]
     expected_next = last_a + delta
 
     logging.info(f"  Last A:   {last_a}")
     logging.info(f"  First B:  {first_b}")
     logging.info(f"  Expected: {expected_next}")
 
+    if first_b < expected_next and overlap != "skip":
+        logging.info(f"  ⚠ B overlaps A — interleaving by timestamp ({overlap}).")
+        return merge_overlapping(zmd_file, sec_file, dst_folder, dry_run, overlap)
+
     if first_b != expected_next:
         logging.warning("  ❌ CONTINUITY FAILED — timestamps do not line up.")
         if first_b > expected_next:
-            # compute missing count
-            t = expected_next
-            missing = 0
-            while t < first_b:
-                missing += 1
-                t += delta
+            # compute missing count (arithmetically, not one interval at a time)
+            missing = dat_io.missing_intervals(last_a, first_b, delta)
             logging.info(f"   → Missing {missing} interval(s) (from {expected_next} to {first_b - delta})")
         else:
             logging.info("   → B starts earlier than expected (overlap).")
         return False
 
     # Continuity OK — merge with header from SECOND file only once at top
-    header_b = lines_b[:idx_b]
-    merged_lines = []
-    merged_lines.extend(header_b)                       # header once
-    merged_lines.extend([ln + "\n" for ln in data_a])  # all data from A
-    merged_lines.extend([ln + "\n" for ln in data_b])  # all data from B
-
     out_path = os.path.join(dst_folder, os.path.basename(sec_file))
     os.makedirs(dst_folder, exist_ok=True)
 
     if dry_run:
         logging.info(f"  (dry-run) Would write merged file: {out_path}")
     else:
-        with open(out_path, "w", encoding="utf-8") as fo:
-            fo.writelines(merged_lines)
-        logging.info(f"  ✅ Wrote merged file: {out_path}")
+        # header once, all data from A, all data from B — streamed row by row
+        # one parser per file, so each learns its own timestamp layout
+        rows_a, rows_b = dat_io.stream_merge(
+            zmd_file, sec_file, out_path,
+            data_row_check(TimestampParser(TS_FORMATS)),
+            data_row_check(TimestampParser(TS_FORMATS)),
+        )
+        logging.info(f"  ✅ Wrote merged file: {out_path} ({rows_a} + {rows_b} rows)")
+
+    return True
+
 
+def merge_fragments(files, dst_folder, dry_run=False, prefer="prefer-b"):
+    """
+    Merge all fragments of one table with a heap-based k-way merge.
+    Fragments are ordered by first timestamp; duplicate timestamps are dropped
+    (prefer picks which row is kept). Output is named after the newest fragment.
+    """
+    logging.info("\nMerging fragments:\n" + "\n".join(f"  - {f}" for f in files))
+
+    starts = {f: get_first_last_ts(f)[0] for f in files}
+    if not any(starts.values()):
+        logging.warning("  ❌ No data rows found in any fragment — skipping.")
+        return False
+
+    delta, _ = table_interval(files, make_row_reader)
+    newest = max((f for f in files if starts[f]), key=lambda f: starts[f])
+    out_path = os.path.join(dst_folder, os.path.basename(newest))
+    os.makedirs(dst_folder, exist_ok=True)
+
+    if dry_run:
+        logging.info(f"  (dry-run) Would write merged file: {out_path}")
+        return True
+
+    stats = dat_io.stream_kway_merge(
+        files, out_path, make_row_reader, prefer=prefer, delta=delta,
+    )
+    for path in stats["empty"]:
+        logging.warning(f"  ⚠ No data rows found in {os.path.basename(path)}")
+    logging.info(
+        f"  ✅ Wrote merged file: {out_path} ({stats['rows']} rows; "
+        f"{stats['duplicates']} duplicate(s) dropped, {stats['gaps']} gap(s))"
+    )
+    return True
+
+
+def make_row_reader():
+    """Return a line -> datetime function with its own TimestampParser."""
+    parser = TimestampParser(TS_FORMATS)
+    return lambda ln: row_timestamp(ln, parser)
+
+
+def merge_overlapping(zmd_file, sec_file, dst_folder, dry_run, prefer):
+    """Interleave A and B by timestamp; prefer picks the row for timestamps in both."""
+    out_path = os.path.join(dst_folder, os.path.basename(sec_file))
+    os.makedirs(dst_folder, exist_ok=True)
+
+    if dry_run:
+        logging.info(f"  (dry-run) Would write merged file: {out_path}")
+        return True
+
+    stats = dat_io.stream_interleave(
+        zmd_file, sec_file, out_path, make_row_reader(), make_row_reader(), prefer=prefer,
+    )
+    logging.info(
+        f"  ✅ Wrote merged file: {out_path} ({stats['from_a']} from A + {stats['from_b']} from B; "
+        f"{stats['overlap']} overlapping, {stats['replaced']} replaced)"
+    )
     return True
 
 
@@ -448,16 +489,22 @@ def main():
     parser.add_argument("--src", required=True, help="Folder with .dat files (one station folder)")
     parser.add_argument("--dst", required=True, help="Destination folder for merged files")
     parser.add_argument("--dry-run", action="store_true", help="Do not write files; show what would happen")
+    parser.add_argument("--overlap", choices=("skip",) + dat_io.OVERLAP_MODES, default="skip",
+                        help="When B starts before A ends: skip, or interleave keeping A's, B's or the less-NAN row")
     args = parser.parse_args()
 
     pairs = pair_files_in_folder(args.src)
-    logging.info(f"Found {len(pairs)} pair(s) to check.")
+    logging.info(f"Found {len(pairs)} pair(s) / fragment group(s) to check.")
 
-    for zmd, sec in pairs:
+    for kind, files in pairs:
         try:
-            merge_pair(zmd, sec, args.dst, dry_run=args.dry_run)
+            if kind == "pair":
+                merge_pair(files[0], files[1], args.dst, dry_run=args.dry_run, overlap=args.overlap)
+            else:
+                prefer = args.overlap if args.overlap != "skip" else "prefer-b"
+                merge_fragments(files, args.dst, dry_run=args.dry_run, prefer=prefer)
         except Exception as e:
-            logging.error(f"Error for pair {zmd} & {sec}: {e}")
+            logging.error(f"Error for {', '.join(files)}: {e}")
 
 
 if __name__ == "__main__":
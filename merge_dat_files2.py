@@ -16,20 +16,15 @@ import os
 import re
 import argparse
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
-logging.basicConfig(level=logging.INFO, format="%(message)s")
+from toa5 import dat_io
+from toa5.catalog import Catalog
+from toa5.compress import open_dat
+from toa5.interval import table_interval
 
-# Expected frequencies (suffix -> timedelta)
-FREQ_MAP = {
-    "TableDay": timedelta(days=1),
-    "TableETHour": timedelta(hours=1),
-    "TableHour": timedelta(hours=1),
-    "SYNOP": timedelta(hours=1),
-    "TableSolarCharger10m": timedelta(minutes=10),
-    "Table10m": timedelta(minutes=10),
-}
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 # Timestamp regex: match "M/D/YYYY H:MM" or "MM/DD/YYYY HH:MM" optionally with seconds
 TS_REGEX = re.compile(r"^\s*(\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}(?::\d{2})?)")
@@ -40,7 +35,7 @@ TS_FORMATS = ("%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%d/%m
 
 # ---------- helpers ----------
 def read_lines(path):
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+    with open_dat(path) as f:
         return f.readlines()
 
 
@@ -55,6 +50,17 @@ def try_parse_ts(txt):
     raise ValueError(f"Unknown timestamp format: {txt!r}")
 
 
+def row_timestamp(ln):
+    """Datetime a data row starts with, or None."""
+    m = TS_REGEX.match(ln)
+    if not m:
+        return None
+    try:
+        return try_parse_ts(m.group(1))
+    except ValueError:
+        return None
+
+
 def find_first_data_index(lines):
     for i, ln in enumerate(lines):
         clean = (
@@ -104,39 +110,31 @@ def get_first_last_ts_from_lines(lines):
     return idx, first_ts, last_ts, data_lines
 
 
-def get_suffix_from_name(name):
-    base = os.path.basename(name)
-    for suf in FREQ_MAP.keys():
-        if suf in base:
-            return suf
-    return None
-
-
 # ---------- pairing ----------
 def pair_files_in_folder(src_folder):
     """
-    Pair by suffix. For each suffix in FREQ_MAP we look for a ZMD file and a SECONDARY file.
+    Pair by station and table (each name parsed once, see toa5/catalog.py):
+    a ZMD file and a file of any other role (e.g. SECONDARY) of the same table.
     Returns list of (zmd_path, secondary_path).
     """
-    all_files = [
-        os.path.join(src_folder, f)
-        for f in os.listdir(src_folder)
-        if f.lower().endswith(".dat") and os.path.isfile(os.path.join(src_folder, f))
-    ]
+    catalog = Catalog.from_folder(src_folder)
+    for name in catalog.unknown:
+        logging.warning(f"⚠ Unrecognised file name, not merged: {name}")
 
     pairs = []
-    for suf in FREQ_MAP.keys():
+    for suf, entries in catalog.table_groups():
         zmd = None
         sec = None
-        for f in all_files:
-            fn = os.path.basename(f).upper()
-            if suf.upper() in fn:
-                if "ZMD" in fn:
-                    zmd = f
-                elif "SECONDARY" in fn:
-                    sec = f
+        for e in entries:
+            if e.role == "ZMD":
+                zmd = os.path.join(src_folder, e.name)
+            else:
+                sec = os.path.join(src_folder, e.name)
         if zmd and sec:
             pairs.append((zmd, sec))
+        else:
+            names = ", ".join(e.name for e in entries)
+            logging.warning(f"⚠ No ZMD and other-role pair of {entries[0].station} {suf}, not merged: {names}")
     return pairs
 
 
@@ -157,12 +155,14 @@ def merge_pair(zmd_file, sec_file, dst_folder, dry_run=False):
         logging.warning(f"  ❌ No data rows found in {os.path.basename(sec_file)} — skipping.")
         return False
 
-    suffix = get_suffix_from_name(sec_file)
-    if suffix is None or suffix not in FREQ_MAP:
-        logging.warning(f"  ⚠ Unknown or missing suffix for {os.path.basename(sec_file)} — skipping.")
+    # FREQ_MAP for the known tables, otherwise inferred from the first/last rows
+    delta, source = table_interval([zmd_file, sec_file], lambda: row_timestamp)
+    if delta is None:
+        logging.warning(f"  ⚠ Cannot tell the interval of {os.path.basename(sec_file)} ({source}) — skipping.")
         return False
+    if source != "table type":
+        logging.info(f"  Interval: {delta} ({source})")
 
-    delta = FREQ_MAP[suffix]
     expected_next = last_a + delta
 
     logging.info(f"  Last A:   {last_a}")
@@ -172,12 +172,8 @@ def merge_pair(zmd_file, sec_file, dst_folder, dry_run=False):
     if first_b != expected_next:
         logging.warning("  ❌ CONTINUITY FAILED — timestamps do not line up.")
         if first_b > expected_next:
-            # compute missing count
-            t = expected_next
-            missing = 0
-            while t < first_b:
-                missing += 1
-                t += delta
+            # compute missing count (arithmetically, not one interval at a time)
+            missing = dat_io.missing_intervals(last_a, first_b, delta)
             logging.info(f"   → Missing {missing} interval(s) (from {expected_next} to {first_b - delta})")
         else:
             logging.info("   → B starts earlier than expected (overlap).")
@@ -196,7 +192,7 @@ def merge_pair(zmd_file, sec_file, dst_folder, dry_run=False):
     if dry_run:
         logging.info(f"  (dry-run) Would write merged file: {out_path}")
     else:
-        with open(out_path, "w", encoding="utf-8") as fo:
+        with open_dat(out_path, "w") as fo:
             fo.writelines(merged_lines)
         logging.info(f"  ✅ Wrote merged file: {out_path}")
 
@@ -0,0 +1,5 @@
+# the tests import toa5 from the repository root, however pytest is started
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
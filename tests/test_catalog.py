@@ -0,0 +1,52 @@
+"""
+File-name parsing (toa5/catalog.py) and how names are grouped for merging.
+
+    python -m pytest tests
+"""
+
+import os
+
+import pytest
+
+from toa5.catalog import parse_name
+from toa5.merge import find_table_groups
+
+
+@pytest.mark.parametrize("name, station, role, table", [
+    ("Kalene_ZMD_SYNOP.dat", "Kalene", "ZMD", "SYNOP"),
+    ("kalene_secondary_table10m (1).dat.gz", "kalene", "Secondary", "Table10m"),
+    ("Kalene_ZMD_SYNOP_2.dat", "Kalene", "ZMD", "SYNOP"),
+    ("Kalene_ZMD_Table5m.dat", "Kalene", "ZMD", "Table5m"),
+    ("Kalabo_CR1000X_SYNOP.dat", "Kalabo", "CR1000X", "SYNOP"),
+    ("Kalene_Lusaka_CR1000X_SYNOP.dat", "Kalene_Lusaka", "CR1000X", "SYNOP"),
+    ("Kalene_CR1000X_Table5m.dat", "Kalene", "CR1000X", "Table5m"),
+    # a ZMD/Secondary role wins over a table-like token after it
+    ("Mongu_ZMD_Station_SYNOP.dat", "Mongu", "ZMD", "SYNOP"),
+    ("Lusaka_Secondary_School_ZMD_SYNOP.dat", "Lusaka_Secondary_School", "ZMD", "SYNOP"),
+    # role written before the station
+    ("ZMD_Kalene_SYNOP.dat", "Kalene", "ZMD", "SYNOP"),
+    ("Secondary_Kalene_Table10m.dat", "Kalene", "Secondary", "Table10m"),
+])
+def test_parse_name(name, station, role, table):
+    assert parse_name(name) == (name, station, role, table)
+
+
+@pytest.mark.parametrize("name", ["Kalene.dat", "Kalene_SYNOP.dat", "Kalene_ZMD_SYNOP.csv"])
+def test_parse_name_rejects(name):
+    assert parse_name(name) is None
+
+
+def test_find_table_groups_reports_lone_files(tmp_path, capsys):
+    for name in ("Kalene_ZMD_SYNOP.dat", "ZMD_Kalene_Table10m.dat", "Kalene_Secondary_Table10m.dat",
+                 "Kalene2_CR1000X_SYNOP.dat", "notes.dat"):
+        (tmp_path / name).write_text("")
+
+    groups = find_table_groups(str(tmp_path))
+    out = capsys.readouterr().out
+
+    assert [(suf, sorted(map(os.path.basename, files))) for suf, files in groups] == [
+        ("Table10m", ["Kalene_Secondary_Table10m.dat", "ZMD_Kalene_Table10m.dat"]),
+    ]
+    assert "not merged: Kalene_ZMD_SYNOP.dat" in out
+    assert "not merged: Kalene2_CR1000X_SYNOP.dat" in out
+    assert "notes.dat" in out
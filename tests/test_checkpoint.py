@@ -0,0 +1,173 @@
+"""
+Kill-and-resume tests for checkpointed merges and in-place appends (see
+toa5/checkpoint.py).
+
+Each merge runs in a child process that kills itself (os._exit, so nothing
+is cleaned up) at a checkpoint or half-way through an append; running the
+same merge again must give exactly the output of an uninterrupted run.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import gzip
+import shutil
+import subprocess
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# python -c DRIVER EVERY CRASH_AT merge-args: checkpoints every EVERY rows,
+# killed on checkpoint number CRASH_AT (0: never; from 2 on, one is saved)
+# or, with CRASH_AT "append", after appending part of the new rows
+DRIVER = """
+import os, sys
+from toa5 import checkpoint, dat_io, merge
+
+every, crash_at = int(sys.argv[1]), sys.argv[2]
+init, save = checkpoint.MergeCheckpoint.__init__, checkpoint.MergeCheckpoint.save
+
+def patched_init(self, *args, **kwargs):
+    init(self, *args, **kwargs)
+    self.every = every or self.every
+
+def crashing_save(self, line, out):
+    if crash_at.isdigit() and self.saves + 1 == int(crash_at):
+        out.flush()  # rows past the checkpoint reach the .part file
+        os._exit(9)
+    save(self, line, out)
+
+def crashing_append(src_path, offset, out_path, chunk_size=dat_io.COPY_CHUNK):
+    with open(src_path, "rb") as src, open(out_path, "ab") as out:
+        src.seek(offset)
+        out.write(src.read(1000))  # ends mid-row
+    os._exit(9)
+
+checkpoint.MergeCheckpoint.__init__ = patched_init
+checkpoint.MergeCheckpoint.save = crashing_save
+if crash_at == "append":
+    dat_io.append_tail = crashing_append
+merge.main(sys.argv[3:])
+"""
+
+HEADER = (
+    '"TOA5","Kalene","CR1000X","1","CR1000X.Std.06.02","CPU:ZMD.cr1x","1","SYNOP"\n'
+    '"TIMESTAMP","RECORD","AirTempK","RH"\n'
+    '"TS","RN","K","%"\n'
+    '"","","Smp","Smp"\n'
+)
+
+START = datetime(2024, 1, 1)
+
+
+def write_dat(path, first_hour, hours, repeat=(), newline="\n"):
+    """A SYNOP file with a row every hour from first_hour; the hours in repeat get a second row."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(HEADER.replace("\n", newline))
+        for h in range(first_hour, first_hour + hours):
+            ts = (START + timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S")
+            for k in range(2 if h in repeat else 1):
+                f.write(f'"{ts}",{h},{280 + h % 20}.{k},{h % 100}{newline}')
+
+
+def gzip_file(path):
+    with open(path, "rb") as src, gzip.open(str(path) + ".gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+
+
+def run_merge(src, dst, *args, every=0, crash_at=0):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, "-c", DRIVER, str(every), str(crash_at), "--src", str(src), "--dst", str(dst), *args],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+
+
+def read_outputs(dst):
+    # compressed: the blocks are cut at different places when resumed
+    return {
+        name: (gzip.open if name.endswith(".gz") else open)(dst / name, "rb").read()
+        for name in sorted(os.listdir(dst))
+    }
+
+
+def assert_resumes(src, tmp_path, args, every, crash_at):
+    done = run_merge(src, tmp_path / "ref", *args)
+    assert done.returncode == 0, done.stderr
+
+    killed = run_merge(src, tmp_path / "out", *args, every=every, crash_at=crash_at)
+    assert killed.returncode == 9, killed.stdout + killed.stderr
+    assert any(name.endswith(".part.json") for name in os.listdir(tmp_path / "out"))
+
+    resumed = run_merge(src, tmp_path / "out", *args, every=every)
+    assert resumed.returncode == 0, resumed.stderr
+    assert "Resuming an interrupted merge" in resumed.stdout
+    assert read_outputs(tmp_path / "out") == read_outputs(tmp_path / "ref")
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_pair_resumes_at_a_repeated_timestamp(tmp_path, newline):
+    # the first checkpoint falls between the two rows of hour 999
+    src = tmp_path / "src"
+    src.mkdir()
+    write_dat(src / "Kalene_ZMD_SYNOP.dat", 0, 2500, repeat={999}, newline=newline)
+    write_dat(src / "Kalene_Secondary_SYNOP.dat", 2500, 1500, repeat={3000}, newline=newline)
+    assert_resumes(src, tmp_path, [], every=1000, crash_at=2)
+
+
+@pytest.mark.parametrize("first_b, args", [(2500, []), (2490, ["--overlap", "prefer-a"])])
+def test_compressed_resumes_at_a_repeated_timestamp(tmp_path, first_b, args):
+    # as above, with .gz inputs (and output)
+    src = tmp_path / "src"
+    src.mkdir()
+    write_dat(src / "Kalene_ZMD_SYNOP.dat", 0, 2500, repeat={999})
+    write_dat(src / "Kalene_Secondary_SYNOP.dat", first_b, 1500, repeat={3000})
+    for name in os.listdir(src):
+        gzip_file(src / name)
+    assert_resumes(src, tmp_path, args, every=1000, crash_at=2)
+
+
+@pytest.mark.parametrize("crash_at", [2, 4, 9])
+def test_interleave_resumes(tmp_path, crash_at):
+    src = tmp_path / "src"
+    src.mkdir()
+    write_dat(src / "Kalene_ZMD_SYNOP.dat", 0, 600, repeat=set(range(5, 600, 50)))
+    write_dat(src / "Kalene_Secondary_SYNOP.dat", 590, 600, repeat=set(range(600, 1190, 70)))
+    assert_resumes(src, tmp_path, ["--overlap", "prefer-a"], every=50, crash_at=crash_at)
+
+
+@pytest.mark.parametrize("crash_at", [2, 4, 9])
+def test_fragments_resume(tmp_path, crash_at):
+    src = tmp_path / "src"
+    src.mkdir()
+    write_dat(src / "Kalene_Secondary_SYNOP.dat", 0, 400, repeat=set(range(3, 400, 41)))
+    write_dat(src / "Kalene_Secondary_SYNOP_2.dat", 350, 400, repeat=set(range(360, 750, 37)))
+    write_dat(src / "Kalene_Secondary_SYNOP_3.dat", 740, 200)
+    assert_resumes(src, tmp_path, ["--fill-gaps"], every=50, crash_at=crash_at)
+
+
+def test_killed_append_is_undone(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    zmd, secondary = src / "Kalene_ZMD_SYNOP.dat", src / "Kalene_Secondary_SYNOP.dat"
+    write_dat(zmd, 0, 300)
+    write_dat(secondary, 300, 300)
+    for dst in ("ref", "out"):
+        assert run_merge(src, tmp_path / dst).returncode == 0
+
+    # the logger carries on; the refresh appends the new rows
+    write_dat(secondary, 300, 500)
+    assert run_merge(src, tmp_path / "ref", "--incremental").returncode == 0
+
+    killed = run_merge(src, tmp_path / "out", "--incremental", crash_at="append")
+    assert killed.returncode == 9
+    assert (tmp_path / "out" / "Kalene_Secondary_SYNOP.dat.append.json").exists()
+
+    again = run_merge(src, tmp_path / "out", "--incremental")
+    assert again.returncode == 0, again.stderr
+    assert "never finished" in again.stdout
+    assert read_outputs(tmp_path / "out") == read_outputs(tmp_path / "ref")
@@ -0,0 +1,30 @@
+"""
+Merging a station folder with toa5.merge.main.
+
+    python -m pytest tests
+"""
+
+import os
+
+from toa5 import merge
+
+HEADER = (
+    '"TOA5","Kalene","CR1000X","1","CR1000X.Std.06.02","CPU:ZMD.cr1x","1","SYNOP"\n'
+    '"TIMESTAMP","RECORD","AirTempK","RH"\n'
+    '"TS","RN","K","%"\n'
+    '"","","Smp","Smp"\n'
+)
+
+
+def test_empty_fragments_are_not_reported_as_merged(tmp_path, capsys):
+    src, dst = tmp_path / "src", tmp_path / "out"
+    src.mkdir()
+    for name in ("Kalene_Secondary_SYNOP.dat", "Kalene_Secondary_SYNOP_2.dat"):
+        (src / name).write_text(HEADER)
+
+    merge.main(["--src", str(src), "--dst", str(dst)])
+    out = capsys.readouterr().out
+
+    assert "nothing to merge" in out
+    assert "Wrote merged" not in out
+    assert not os.listdir(dst)
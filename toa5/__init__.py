@@ -0,0 +1,10 @@
+"""
+toa5
+
+Tools for Campbell Scientific TOA5 .dat files from the ZMD stations:
+merging the ZMD/Secondary downloads, scanning and comparing station dates,
+auditing continuity and downloading from the station file API.
+
+Run `python -m toa5 <command> --help`. Nothing heavy (numpy, openpyxl,
+tkinter, requests) is imported until a command needs it.
+"""
@@ -0,0 +1,3 @@
+from toa5.cli import main
+
+main()
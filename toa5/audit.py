@@ -0,0 +1,207 @@
+"""
+audit.py
+
+Full-file continuity audit for .dat files.
+
+merge_pair only checks the A/B boundary. This loads the whole TIMESTAMP
+column of a file into a NumPy datetime64 array and compares every
+consecutive difference against the table interval in one vectorized pass,
+reporting each gap (start, end, missing count), duplicate timestamp and
+backwards jump, with the file line number of the offending row.
+
+Usage:
+  python -m toa5 audit --src "E:/MERGE/Nkeyema"
+  python -m toa5 audit --src "E:/MERGE/Nkeyema" --cache
+  python -m toa5 merge --src "E:/MERGE/Nkeyema" --audit
+"""
+
+import os
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+from toa5.compress import is_dat_name, open_dat
+from toa5.interval import table_interval
+from toa5.tables import HEADER_LINES, TS_FORMATS
+from toa5.ts_parser import TimestampParser
+
+# gaps: (start of gap, end of gap, missing count, line); the others: (timestamp, line)
+AuditResult = namedtuple(
+    "AuditResult",
+    ["path", "rows", "first", "last", "gaps", "duplicates", "backwards", "off_interval", "bad_rows"],
+)
+
+
+def load_timestamps(path, header_lines=HEADER_LINES):
+    """
+    Return (timestamps, line_numbers) for the data rows of a .dat file.
+
+    timestamps is a datetime64[s] array with NaT for rows whose first field
+    isn't a timestamp; line_numbers holds the 1-based file line of each row.
+    """
+    with open_dat(path) as f:
+        for _ in range(header_lines):
+            f.readline()
+        body = f.read()
+
+    lines = body.split("\n")
+    fields = [ln.split(",", 1)[0].strip().strip('"') for ln in lines]
+    keep = np.fromiter((bool(ln.strip()) for ln in lines), dtype=bool, count=len(lines))
+    line_numbers = np.flatnonzero(keep) + header_lines + 1
+
+    # str, not bytes: numpy's bytes -> datetime64 cast can crash on a bad value
+    fields = np.array(fields, dtype=str)[keep]
+    ts = np.full(len(fields), np.datetime64("NaT"), dtype="datetime64[s]")
+
+    # ISO layouts ("YYYY-MM-DD HH:MM[:SS]") convert in one call; only the
+    # rows that don't look like one go through the per-row parser
+    iso = looks_iso(fields)
+    try:
+        ts[iso] = fields[iso].astype("datetime64[s]")
+    except ValueError:
+        iso[:] = False
+
+    rest = np.flatnonzero(~iso)
+    if len(rest):
+        ts[rest] = parse_each(fields[rest])
+
+    return ts, line_numbers
+
+
+def looks_iso(fields):
+    """Boolean mask of the entries shaped like YYYY-MM-DD HH:MM or YYYY-MM-DD HH:MM:SS."""
+    n = np.char.str_len(fields)
+    chars = fields.astype("U19").view("U1").reshape(len(fields), 19)
+    return (
+        ((n == 16) | (n == 19))
+        & (chars[:, 4] == "-") & (chars[:, 7] == "-")
+        & (chars[:, 10] == " ") & (chars[:, 13] == ":")
+        & ((n == 16) | (chars[:, 16] == ":"))
+    )
+
+
+def parse_each(fields):
+    parse = TimestampParser(TS_FORMATS)
+    out = np.empty(len(fields), dtype="datetime64[s]")
+    for i, raw in enumerate(fields):
+        dt = parse(raw)
+        out[i] = np.datetime64(dt, "s") if dt else np.datetime64("NaT")
+    return out
+
+
+def audit_timestamps(ts, line_numbers, delta, path=""):
+    """Vectorized continuity check of a timestamp array against interval delta."""
+    bad = np.isnat(ts)
+    bad_rows = line_numbers[bad].tolist()
+
+    ts = ts[~bad]
+    line_numbers = line_numbers[~bad]
+
+    if len(ts) == 0:
+        return AuditResult(path, 0, None, None, [], [], [], [], bad_rows)
+
+    step = np.timedelta64(int(delta.total_seconds()), "s")
+    d = np.diff(ts)
+
+    # index i refers to the step from row i to row i + 1
+    gap_i = np.flatnonzero(d > step)
+    dup_i = np.flatnonzero(d == np.timedelta64(0, "s"))
+    back_i = np.flatnonzero(d < np.timedelta64(0, "s"))
+    off_i = np.flatnonzero((d > np.timedelta64(0, "s")) & (d % step != np.timedelta64(0, "s")))
+
+    missing = d[gap_i] // step - (d[gap_i] % step == np.timedelta64(0, "s"))
+    gaps = list(zip(
+        (ts[gap_i] + step).astype(object).tolist(),
+        (ts[gap_i + 1] - step).astype(object).tolist(),
+        missing.tolist(),
+        line_numbers[gap_i + 1].tolist(),
+    ))
+
+    return AuditResult(
+        path,
+        len(ts),
+        ts[0].astype(object),
+        ts[-1].astype(object),
+        gaps,
+        list(zip(ts[dup_i + 1].astype(object).tolist(), line_numbers[dup_i + 1].tolist())),
+        list(zip(ts[back_i + 1].astype(object).tolist(), line_numbers[back_i + 1].tolist())),
+        list(zip(ts[off_i + 1].astype(object).tolist(), line_numbers[off_i + 1].tolist())),
+        bad_rows,
+    )
+
+
+def cached_timestamps(path):
+    """(timestamps, line_numbers) from the columnar cache (see toa5.cache)."""
+    from toa5.cache import load_columns
+
+    cols = load_columns(path, ["TIMESTAMP"], with_lines=True)
+    return np.asarray(cols["TIMESTAMP"]), np.asarray(cols["_line"])
+
+
+def audit_file(path, delta, header_lines=HEADER_LINES, use_cache=False):
+    if use_cache:
+        ts, line_numbers = cached_timestamps(path)
+    else:
+        ts, line_numbers = load_timestamps(path, header_lines)
+    return audit_timestamps(ts, line_numbers, delta, path)
+
+
+def print_audit(res):
+    print(f"\n{os.path.basename(res.path)}")
+    print(f"  Rows : {res.rows}")
+    if res.rows:
+        print(f"  First: {res.first}")
+        print(f"  Last : {res.last}")
+
+    if not (res.gaps or res.duplicates or res.backwards or res.off_interval or res.bad_rows):
+        print("  ✅ Continuous")
+        return
+
+    total_missing = sum(g[2] for g in res.gaps)
+    print(
+        f"  ❌ {len(res.gaps)} gap(s) ({total_missing} missing), "
+        f"{len(res.duplicates)} duplicate(s), {len(res.backwards)} backwards, "
+        f"{len(res.off_interval)} off-interval, {len(res.bad_rows)} bad row(s)"
+    )
+    for start, end, n, line in res.gaps:
+        print(f"     gap   {start} → {end}  missing={n}  (line {line})")
+    for ts, line in res.duplicates:
+        print(f"     dup   {ts}  (line {line})")
+    for ts, line in res.backwards:
+        print(f"     back  {ts}  (line {line})")
+    for ts, line in res.off_interval:
+        print(f"     off   {ts}  not on the table interval  (line {line})")
+    for line in res.bad_rows:
+        print(f"     bad   unparseable timestamp  (line {line})")
+
+
+def audit_folder(folder, use_cache=False):
+    """Audit every .dat file whose interval is known or can be inferred; returns the results."""
+    results = []
+    for fname in sorted(os.listdir(folder)):
+        if not is_dat_name(fname):
+            continue
+        path = os.path.join(folder, fname)
+        delta, source = table_interval([path])
+        if delta is None:
+            print(f"\n{fname}\n  ⚠ Unknown interval ({source}) — skipping")
+            continue
+        res = audit_file(path, delta, use_cache=use_cache)
+        print_audit(res)
+        results.append(res)
+    return results
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Check every row of each .dat file for gaps, duplicates and backwards jumps")
+    parser.add_argument("--src", required=True, help="Station folder with .dat files")
+    parser.add_argument("--cache", action="store_true",
+                        help="Read timestamps from the columnar cache (built/refreshed as needed)")
+    args = parser.parse_args(argv)
+
+    audit_folder(args.src, use_cache=args.cache)
+
+
+if __name__ == "__main__":
+    main()
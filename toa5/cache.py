@@ -0,0 +1,170 @@
+"""
+cache.py
+
+Columnar, memory-mappable cache of parsed TOA5 .dat files.
+
+Every tool used to re-read the .dat text row by row. This converts a file
+once into one .npy file per column, typed as by toa5.reader (TIMESTAMP
+as datetime64[s], numeric fields with NaN for "NAN"), plus a meta.json
+with the field names (header line 2), units (line 3), processing (line 4)
+and the size/mtime of the source. Later loads memory-map just the
+columns asked for. A cache whose source has changed size or mtime is
+rebuilt on the next load.
+
+Caches live in a .toa5_cache folder next to the .dat files, one
+sub-folder per source file.
+
+Usage:
+  python -m toa5 cache --src "E:/MERGE/Nkeyema"            # build/refresh every .dat
+  python -m toa5 cache --src file.dat --columns TIMESTAMP AirTC_Avg
+
+  from toa5.cache import load_columns
+  cols = load_columns(path, ["TIMESTAMP", "RECORD"])
+"""
+
+import os
+import json
+import shutil
+import argparse
+import time
+
+import numpy as np
+
+from toa5.compress import is_dat_name
+from toa5.reader import parse_file
+
+CACHE_DIR = ".toa5_cache"
+META_NAME = "meta.json"
+
+# bump when the on-disk layout changes, so old caches get rebuilt
+CACHE_VERSION = 2
+
+
+def convert(path, cache_path):
+    """Parse path and write its columns into cache_path; returns the meta dict."""
+    st = os.stat(path)
+    header, data, line_numbers = parse_file(path, with_lines=True)
+
+    tmp = cache_path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    dtypes = []
+    for n, name in enumerate(header.fields):
+        arr = data[name]
+        if arr.dtype == object:
+            # text fields: fixed-width str so the column can be memory-mapped
+            arr = arr.astype(str)
+        np.save(os.path.join(tmp, f"{n:03d}.npy"), arr)
+        dtypes.append(str(arr.dtype))
+
+    # 1-based file line of each row, for reports
+    np.save(os.path.join(tmp, "lines.npy"), line_numbers)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": os.path.basename(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "rows": len(line_numbers),
+        "environment": header.environment,
+        "fields": header.fields,
+        "units": header.units,
+        "processing": header.processing,
+        "dtypes": dtypes,
+    }
+    with open(os.path.join(tmp, META_NAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+
+    shutil.rmtree(cache_path, ignore_errors=True)
+    os.replace(tmp, cache_path)
+    return meta
+
+
+def cache_path_for(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR, name)
+
+
+def read_meta(cache_path):
+    try:
+        with open(os.path.join(cache_path, META_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(meta, path):
+    if not meta or meta.get("version") != CACHE_VERSION:
+        return False
+    st = os.stat(path)
+    return meta["size"] == st.st_size and meta["mtime_ns"] == st.st_mtime_ns
+
+
+def ensure_cache(path):
+    """Return (cache_path, meta), converting path first if the cache is missing or stale."""
+    cache_path = cache_path_for(path)
+    meta = read_meta(cache_path)
+    if not is_fresh(meta, path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        meta = convert(path, cache_path)
+    return cache_path, meta
+
+
+def load_columns(path, columns=None, with_lines=False):
+    """
+    Dict of field name -> memory-mapped array for a .dat file, via its cache.
+
+    columns limits the result to those field names (KeyError for unknown
+    ones). with_lines adds a "_line" entry with the file line of each row.
+    """
+    cache_path, meta = ensure_cache(path)
+    fields = meta["fields"]
+    wanted = fields if columns is None else columns
+
+    out = {}
+    for name in wanted:
+        if name not in fields:
+            raise KeyError(f"{name} is not a field of {os.path.basename(path)}")
+        n = fields.index(name)
+        out[name] = np.load(os.path.join(cache_path, f"{n:03d}.npy"), mmap_mode="r")
+    if with_lines:
+        out["_line"] = np.load(os.path.join(cache_path, "lines.npy"), mmap_mode="r")
+    return out
+
+
+def load_meta(path):
+    """Header information (fields, units, processing, rows, ...) of a .dat file, via its cache."""
+    return ensure_cache(path)[1]
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Build or refresh the columnar cache of .dat files")
+    parser.add_argument("--src", required=True, help="A .dat file or a station folder")
+    parser.add_argument("--columns", nargs="+", help="Load and summarise only these fields")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.src):
+        paths = [os.path.join(args.src, n) for n in sorted(os.listdir(args.src)) if is_dat_name(n)]
+    else:
+        paths = [args.src]
+
+    for path in paths:
+        t0 = time.perf_counter()
+        fresh = is_fresh(read_meta(cache_path_for(path)), path)
+        cols = load_columns(path, args.columns)
+        dt = time.perf_counter() - t0
+
+        meta = load_meta(path)
+        state = "cached" if fresh else "built"
+        print(f"\n{os.path.basename(path)}  ({state} in {dt:.3f} s)")
+        print(f"  Rows   : {meta['rows']}")
+        print(f"  Fields : {len(meta['fields'])}")
+        if args.columns:
+            for name, arr in cols.items():
+                unit = meta["units"][meta["fields"].index(name)]
+                print(f"  {name:<20} {str(arr.dtype):<14} {unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+catalog.py
+
+Logger filenames, parsed once: 'Kalene_ZMD_SYNOP.dat' -> station 'Kalene',
+role 'ZMD', table 'SYNOP'. The role can be any token ('Kalabo_CR1000X_SYNOP.dat');
+only ZMD matters, as the A side of a pair, and every other role is the B
+side, as Secondary is. A ZMD or Secondary role is also found written before
+the station ('ZMD_Kalene_SYNOP.dat') or with other tokens before the table. Anything after the table name ('_2', ' (1)')
+is allowed, so repeated downloads of a table are recognised as fragments,
+and so is a compression suffix ('.dat.gz', '.dat.xz', '.dat.bz2').
+Table names not in FREQ_MAP ('Table5m') are accepted as they are written;
+interval.py works out their interval.
+
+A Catalog indexes a folder listing (or the server's file list) by station
+and table in one pass, so pairing, scanning and downloading look files up
+instead of matching every name against every table type. Names that don't
+fit the pattern are kept in .unknown so they can be reported.
+"""
+
+import os
+import re
+from collections import namedtuple
+
+from toa5.compress import is_dat_name
+from toa5.tables import TABLE_TYPES
+
+ROLES = ("ZMD", "Secondary")
+
+DatName = namedtuple("DatName", "name station role table")
+
+_ROLES = {r.lower(): r for r in ROLES}
+_TABLES = {t.lower(): t for t in TABLE_TYPES}
+
+# known tables longest first, so no table type can match as part of another
+_KNOWN_TABLE = "|".join(sorted(TABLE_TYPES, key=len, reverse=True))
+_ANY_TABLE = r"[A-Za-z][A-Za-z0-9]*"
+_ANY_ROLE = r"[A-Za-z0-9]+"
+
+_STATION_FIRST = r"(?P<station>.+?)_(?P<role>{role})_(?P<table>{table})"
+# 'ZMD_Kalene_SYNOP.dat'
+_ROLE_FIRST = r"(?P<role>{role})_(?P<station>.+?)_(?P<table>{table})"
+# 'Mongu_ZMD_Station_SYNOP.dat': other tokens (not a role) between role and table
+_TOKENS_BETWEEN = r"(?P<station>.+?)_(?P<role>{role})_(?:(?!(?:{role})_)[A-Za-z0-9]+_)*?(?P<table>{table})"
+
+
+def _name_re(layout, role, table):
+    return re.compile(
+        "^" + layout.format(role=role, table=table) + r"(?![A-Za-z0-9]).*\.dat(?:\.gz|\.xz|\.bz2)?$",
+        re.IGNORECASE,
+    )
+
+
+# tried in order: a ZMD/Secondary role before a known table, written first
+# or last; a ZMD/Secondary role before any table ('Kalene_ZMD_Table5m.dat');
+# then any role before a known table, so 'Kalene_Lusaka_CR1000X_SYNOP.dat'
+# is station 'Kalene_Lusaka' and not role 'Lusaka'; then any role before
+# any alphanumeric table name
+_KNOWN_ROLE = "|".join(ROLES)
+NAME_RES = [
+    _name_re(_TOKENS_BETWEEN, _KNOWN_ROLE, _KNOWN_TABLE),
+    _name_re(_ROLE_FIRST, _KNOWN_ROLE, _KNOWN_TABLE),
+    _name_re(_STATION_FIRST, _KNOWN_ROLE, _ANY_TABLE),
+    _name_re(_STATION_FIRST, _ANY_ROLE, _KNOWN_TABLE),
+    _name_re(_STATION_FIRST, _ANY_ROLE, _ANY_TABLE),
+]
+
+
+def parse_name(name):
+    """DatName for a logger filename (any case), or None if it doesn't fit the pattern."""
+    base = os.path.basename(name)
+    m = next((m for m in (r.match(base) for r in NAME_RES) if m), None)
+    if not m:
+        return None
+    role = m.group("role")
+    return DatName(
+        name, m.group("station"), _ROLES.get(role.lower(), role),
+        _TABLES.get(m.group("table").lower(), m.group("table")),
+    )
+
+
+class Catalog:
+    """Filenames indexed by station and (station, table); see the module docstring."""
+
+    def __init__(self, names=()):
+        self.entries = []
+        self.unknown = []
+        self.by_name = {}
+        self._stations = {}  # lowercased station -> [DatName]
+        self._tables = {}    # (lowercased station, table) -> [DatName]
+        for name in names:
+            self.add(name)
+
+    @classmethod
+    def from_folder(cls, folder):
+        return cls(sorted(f for f in os.listdir(folder) if is_dat_name(f)))
+
+    def add(self, name):
+        entry = parse_name(name)
+        if entry is None:
+            self.unknown.append(name)
+            return None
+
+        self.entries.append(entry)
+        self.by_name[name] = entry
+        key = entry.station.lower()
+        self._stations.setdefault(key, []).append(entry)
+        self._tables.setdefault((key, entry.table), []).append(entry)
+        return entry
+
+    def stations(self):
+        """Station names as written in the first file of each, sorted case-insensitively."""
+        return [entries[0].station for _, entries in sorted(self._stations.items())]
+
+    def station_files(self, station):
+        return [e.name for e in self._stations.get(station.lower(), [])]
+
+    def table_groups(self):
+        """[(table, [DatName])] per station and table, in TABLE_TYPES order, other tables last."""
+        order = {t: i for i, t in enumerate(TABLE_TYPES)}
+        keys = sorted(self._tables, key=lambda k: (order.get(k[1], len(order)), k[1], k[0]))
+        return [(table, self._tables[(station, table)]) for station, table in keys]
+
+    def report_unknown(self):
+        for name in self.unknown:
+            print(f"  ⚠ Unrecognised file name (expected <Station>_<ZMD|Secondary|...>_<Table>.dat): {name}")
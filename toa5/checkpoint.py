@@ -0,0 +1,250 @@
+"""
+checkpoint.py
+
+Crash-safe, resumable merge output.
+
+A merge doesn't write its output in place: it writes <out>.part, and every
+CHECKPOINT_ROWS rows it fsyncs that and records in <out>.part.json how far
+it got: the bytes of .part that are complete, the last timestamp written,
+where each input continues (the byte offset of its first row not yet
+written) and the counters so far. If the run is interrupted, the next run
+of the same merge (same inputs, unchanged, and same options) truncates
+.part to the recorded size, seeks each input to its offset and carries on
+from there instead of starting over. When the merge is complete, .part is
+fsynced and renamed over <out>, so <out> is always either the previous
+file or the complete new one, never a truncated one.
+
+Inputs are read through dat_io.OffsetReader (CountingReader if compressed,
+where offsets are into the decompressed text), so the offsets are exact
+even where rows repeat a timestamp. Resuming reads a compressed input
+forward to its offset, as a fresh run decompresses it from the start.
+
+An incremental merge appends to <out> in place instead; guarded_append()
+records its size in <out>.append.json first, so an append that fails, or
+whose run is killed, is cut back off (undo_interrupted_append).
+
+    checkpoint = MergeCheckpoint(out, [a_file, b_file], {"merge": "pair"}, make_row_ts)
+    dat_io.stream_merge(a_file, b_file, out, is_row, checkpoint=checkpoint)
+"""
+
+import os
+import json
+from contextlib import contextmanager
+from datetime import datetime
+
+from toa5.compress import codec_suffix, fsync_dat, is_compressed, open_dat
+from toa5.dat_io import CountingReader, OffsetReader
+
+# Rows written between checkpoints (about 60 MB of SYNOP rows)
+CHECKPOINT_ROWS = 250_000
+
+# Bumped when the state file changes shape; older states are ignored
+STATE_VERSION = 3
+
+# Next to a file being appended to in place: its size before the append
+APPEND_SUFFIX = ".append.json"
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+
+
+def fsync_dir(path):
+    """fsync a directory so a rename in it is durable (not possible on Windows)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class MergeCheckpoint:
+    """The .part file and checkpoint state of one merge output; see the module docstring."""
+
+    def __init__(self, out_path, inputs, options, make_row_ts, every=CHECKPOINT_ROWS):
+        self.out_path = out_path
+        self.part_path = out_path + ".part"
+        self.state_path = self.part_path + ".json"
+        self.inputs = list(inputs)
+        self.every = every
+        self.saves = 0
+
+        self.readers = {}
+        self.row_ts_out = make_row_ts()
+
+        self.key = {
+            "version": STATE_VERSION,
+            "inputs": [file_signature(p) for p in self.inputs],
+            "options": options,
+        }
+        self.state = self.load()
+        self.counters = {}
+        self.fill = None
+
+    @property
+    def resuming(self):
+        return self.state is not None
+
+    @property
+    def last_ts(self):
+        return datetime.fromisoformat(self.state["last_ts"]) if self.state else None
+
+    def load(self):
+        """The saved state, if it belongs to this merge and its .part is still there."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("key") != self.key:
+            return None
+        try:
+            if os.path.getsize(self.part_path) < state["out_bytes"]:
+                return None
+        except OSError:
+            return None
+        return state
+
+    def open_output(self, buffer_size=-1):
+        """Open .part for writing: from scratch, or cut back to the checkpoint and appended to."""
+        codec = codec_suffix(self.out_path).lstrip(".")
+        if self.state is None:
+            remove_quietly(self.state_path)
+            return open_dat(self.part_path, "w", buffer_size, codec=codec)
+
+        with open(self.part_path, "r+b") as f:
+            f.truncate(self.state["out_bytes"])
+        return open_dat(self.part_path, "a", buffer_size, codec=codec)
+
+    def open_input(self, path):
+        """Open input path through an OffsetReader, so save() knows where it continues."""
+        reader = CountingReader(path) if is_compressed(path) else OffsetReader(path)
+        self.readers[path] = reader
+        return reader
+
+    def track(self, fill=None, **counters):
+        """
+        Register the merge's counters (dicts or lists, updated in place) and
+        GapFiller; when resuming they are set back to their saved values.
+        """
+        self.counters = counters
+        self.fill = fill
+        if self.state is None:
+            return
+
+        for name, saved in self.state["counters"].items():
+            if isinstance(counters[name], dict):
+                counters[name].update(saved)
+            else:
+                counters[name][:] = saved
+        if fill is not None and self.state.get("fill"):
+            fill.last = self.last_ts
+            fill.ts_len, fill.gaps, fill.rows = self.state["fill"]
+
+    def seek(self, f, path):
+        """Move f (open_input(path)) to where its rows continue."""
+        f.seek(self.state["offsets"][self.inputs.index(path)])
+
+    def save(self, line, out):
+        """
+        Checkpoint after line, the last row written to out. Every input must
+        have been read one row past the output (or to its end): the row its
+        reader read last is where it continues.
+        """
+        ts = self.row_ts_out(line)
+        if ts is None:
+            return
+        fsync_dat(out)
+
+        # per input, in the order given
+        offsets = [self.readers[p].start for p in self.inputs]
+
+        state = {
+            "key": self.key,
+            "out_bytes": os.fstat(out.fileno()).st_size,
+            "last_ts": ts.isoformat(sep=" "),
+            "offsets": offsets,
+            "counters": self.counters,
+            "fill": [self.fill.ts_len, self.fill.gaps, self.fill.rows] if self.fill is not None else None,
+        }
+        write_state(self.state_path, state)
+        self.saves += 1
+
+    def complete(self, out):
+        """fsync and close out (the .part), rename it over the output and drop the state."""
+        fsync_dat(out)
+        out.close()
+        os.replace(self.part_path, self.out_path)
+        fsync_dir(os.path.dirname(os.path.abspath(self.out_path)))
+        remove_quietly(self.state_path)
+
+
+def write_state(path, state):
+    """Write a JSON state file durably: to a temporary file, fsynced, then renamed over path."""
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+# ---------- in-place appends ----------
+
+def truncate(path, size):
+    with open(path, "r+b") as f:
+        f.truncate(size)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+@contextmanager
+def guarded_append(out_path):
+    """
+    Make an append to out_path inside the block undoable: its size and
+    identity are recorded in <out>.append.json first, and if the block
+    raises, out is cut back to that size. If the process dies instead, the
+    record is left behind for undo_interrupted_append().
+    """
+    state_path = out_path + APPEND_SUFFIX
+    st = os.stat(out_path)
+    write_state(state_path, {"size": st.st_size, "file": [st.st_dev, st.st_ino]})
+    try:
+        yield
+    except BaseException:
+        truncate(out_path, st.st_size)
+        remove_quietly(state_path)
+        raise
+    remove_quietly(state_path)
+
+
+def undo_interrupted_append(out_path):
+    """
+    Cut out_path back to its size before an append that never finished;
+    True if there was one. A record for a file that has since been replaced
+    (another inode) is just dropped.
+    """
+    state_path = out_path + APPEND_SUFFIX
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        size, file_id = state["size"], state["file"]
+        st = os.stat(out_path)
+    except (OSError, ValueError, KeyError, TypeError):
+        remove_quietly(state_path)
+        return False
+
+    undone = file_id == [st.st_dev, st.st_ino] and st.st_size >= size
+    if undone:
+        truncate(out_path, size)
+    remove_quietly(state_path)
+    return undone
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,47 @@
+"""
+cli.py
+
+`python -m toa5 <command> [options]` — one entry point for every tool.
+
+Only the module of the chosen command is imported, so `merge` and `scan`
+start without loading numpy, openpyxl, tkinter or requests.
+"""
+
+import sys
+import importlib
+
+# command -> (module, one-line description)
+COMMANDS = {
+    "merge": ("toa5.merge", "merge the ZMD and Secondary downloads of each table"),
+    "scan": ("toa5.scan", "start/end date of every file in a station folder"),
+    "compare": ("toa5.compare", "which of two stations started recording first"),
+    "download": ("toa5.download", "download a station's files from the API"),
+    "audit": ("toa5.audit", "check every row for gaps, duplicates and backwards jumps"),
+    "cache": ("toa5.cache", "build/refresh the columnar cache of .dat files"),
+    "watch": ("toa5.watch", "watch station folders and merge new data as it lands"),
+}
+
+
+def usage():
+    lines = ["usage: python -m toa5 <command> [options]", "", "commands:"]
+    for name, (_, desc) in COMMANDS.items():
+        lines.append(f"  {name:<10} {desc}")
+    lines.append("")
+    lines.append("python -m toa5 <command> --help shows the options of a command")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        sys.exit(f"\nunknown command: {command}")
+
+    module = importlib.import_module(COMMANDS[command][0])
+    module.main(rest, prog=f"toa5 {command}")
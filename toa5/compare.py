@@ -0,0 +1,132 @@
+"""
+compare.py
+
+Which of two stations started recording first (earliest first timestamp
+over all its .dat files). Each comparison is appended to the
+Station_Comparisons sheet of station_start_date_summary.xlsx.
+
+Usage:
+  python -m toa5 compare                                  # pick both folders in dialogs
+  python -m toa5 compare --a "E:/MERGE/Kalene" --b "E:/MERGE/Nkeyema"
+"""
+
+import os
+import argparse
+
+from toa5 import gui
+from toa5.compress import is_dat_name
+from toa5.scan import open_workbook
+from toa5.scan_cache import ScanCache
+
+# ---------------- CONFIG ----------------
+
+MASTER_XLSX = "station_start_date_summary.xlsx"
+
+# ---------------- HELPERS ----------------
+
+def get_earliest_station_start(folder):
+    earliest = None
+
+    # cached per folder; only new or changed files are read
+    with ScanCache(folder) as cache:
+        for fname in os.listdir(folder):
+            if not is_dat_name(fname):
+                continue
+
+            path = os.path.join(folder, fname)
+            start = cache.scan(path).first
+
+            if start:
+                if earliest is None or start < earliest:
+                    earliest = start
+
+    return earliest
+
+# ---------------- MAIN ----------------
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Compare the earliest start date of two stations")
+    parser.add_argument("--a", help="First station folder (default: choose it in a dialog)")
+    parser.add_argument("--b", help="Second station folder (default: choose it in a dialog)")
+    parser.add_argument("--xlsx", default=MASTER_XLSX, help=f"Summary workbook (default {MASTER_XLSX})")
+    parser.add_argument("--no-excel", action="store_true", help="Only print the result")
+    args = parser.parse_args(argv)
+
+    use_gui = not (args.a and args.b)
+
+    folder_a = gui.ask_directory("Select FIRST station folder") if use_gui else args.a
+    if not folder_a:
+        return
+
+    folder_b = gui.ask_directory("Select SECOND station folder") if use_gui else args.b
+    if not folder_b:
+        return
+
+    station_a = os.path.basename(os.path.normpath(folder_a))
+    station_b = os.path.basename(os.path.normpath(folder_b))
+
+    start_a = get_earliest_station_start(folder_a)
+    start_b = get_earliest_station_start(folder_b)
+
+    if not start_a or not start_b:
+        if use_gui:
+            gui.show_error(
+                "Error",
+                "Could not determine start dates for one or both stations."
+            )
+        print("❌ Could not determine start dates for one or both stations.")
+        return
+
+    if start_a < start_b:
+        winner = station_a
+    elif start_b < start_a:
+        winner = station_b
+    else:
+        winner = "Same start date"
+
+    if not args.no_excel:
+        # Load or create workbook
+        wb = open_workbook(args.xlsx)
+
+        sheet_name = "Station_Comparisons"
+
+        if sheet_name in wb.sheetnames:
+            ws = wb[sheet_name]
+        else:
+            ws = wb.create_sheet(title=sheet_name)
+            ws.append([
+                "Station A",
+                "Station B",
+                "Earliest Start A",
+                "Earliest Start B",
+                "Started Earlier",
+            ])
+
+        ws.append([
+            station_a,
+            station_b,
+            start_a,
+            start_b,
+            winner,
+        ])
+
+        wb.save(args.xlsx)
+
+        if use_gui:
+            gui.show_info(
+                "Comparison Complete",
+                f"Comparison saved to:\n{args.xlsx}\n\n"
+                f"{station_a}: {start_a}\n"
+                f"{station_b}: {start_b}\n\n"
+                f"Started earlier: {winner}"
+            )
+
+        print("✅ Comparison saved")
+
+    print(f"{station_a} → {start_a}")
+    print(f"{station_b} → {start_b}")
+    print(f"Started earlier → {winner}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+compress.py
+
+Transparent gzip / xz / bz2 for .dat files, chosen by the file suffix
+('Kalene_ZMD_SYNOP.dat.gz'). Plain .dat files are opened exactly as before.
+
+open_dat() is used wherever a .dat file is read or written. Reads go
+through a large buffer on both sides of the decompressor. Writes are
+block-compressed: the text is cut at line ends into independent compressed
+streams of about BLOCK_BYTES each, concatenated. Every gzip, xz and bz2
+tool reads that as one file, and appending (download --sync, merge
+--incremental) just adds streams. It also keeps tail-seeks cheap:
+iter_blocks_reverse() finds the start of the last stream by its magic
+bytes near the end of the file and decompresses only that, so the last
+timestamp of a 500 MB archive costs about one block. Compressed files
+written by other tools (one stream for the whole file) still work, but
+their tail is found by decompressing the file once.
+
+    with open_dat("Kalene_ZMD_SYNOP.dat.xz") as f:
+        header = f.readline()
+"""
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import zlib
+from collections import namedtuple
+
+# Buffer on each side of the (de)compressor
+BUFFER_SIZE = 1024 * 1024
+
+# Uncompressed bytes per independently compressed stream when writing
+BLOCK_BYTES = 1024 * 1024
+
+# A "stream" found near the end that decodes to more than this isn't one of
+# ours; the file is then read from the start instead
+MAX_STREAM_BYTES = 8 * BLOCK_BYTES
+
+# How much of the end of a one-stream file is kept when it must be read whole
+TAIL_WINDOW = 1024 * 1024
+
+# Size of each backwards read: of the data for plain files, of the
+# compressed bytes when looking for a stream start
+SEEK_BLOCK = 64 * 1024
+
+# Compression levels. xz's default preset 6 writes at ~4 MB/s on station
+# data; preset 1 writes ~10x faster and still compresses TOA5 text ~10x
+GZIP_LEVEL = 6
+XZ_PRESET = 1
+BZ2_LEVEL = 9
+
+Codec = namedtuple("Codec", "module compress decompressor magic")
+
+CODECS = {
+    ".gz": Codec(
+        gzip,
+        lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0),
+        lambda: zlib.decompressobj(wbits=31),
+        b"\x1f\x8b\x08",
+    ),
+    ".xz": Codec(
+        lzma,
+        lambda data: lzma.compress(data, preset=XZ_PRESET),
+        lzma.LZMADecompressor,
+        b"\xfd7zXZ\x00",
+    ),
+    ".bz2": Codec(bz2, lambda data: bz2.compress(data, BZ2_LEVEL), bz2.BZ2Decompressor, b"BZh"),
+}
+
+# --compress choices
+CODEC_NAMES = tuple(s.lstrip(".") for s in CODECS)
+
+DAT_SUFFIXES = (".dat",) + tuple(".dat" + s for s in CODECS)
+
+
+def codec_suffix(path):
+    """'.gz', '.xz' or '.bz2' for a compressed path, else ''."""
+    lower = path.lower()
+    for suffix in CODECS:
+        if lower.endswith(suffix):
+            return suffix
+    return ""
+
+
+def is_compressed(path):
+    return codec_suffix(path) != ""
+
+
+def is_dat_name(name):
+    """True for 'x.dat' and its compressed forms ('x.dat.gz', ...), any case."""
+    return name.lower().endswith(DAT_SUFFIXES)
+
+
+def with_codec(name, codec):
+    """name with its compression suffix replaced: ('a.dat.gz', 'xz') -> 'a.dat.xz'; codec '' -> 'a.dat'."""
+    suffix = codec_suffix(name)
+    base = name[:-len(suffix)] if suffix else name
+    return base + ("." + codec if codec else "")
+
+
+# ---------- opening ----------
+
+class DecodedReader(io.BufferedReader):
+    """Buffered decompressed view of a compressed file; closing it closes the file too."""
+
+    def __init__(self, path, codec, buffer_size=BUFFER_SIZE):
+        self._file = open(path, "rb", buffering=buffer_size)
+        try:
+            super().__init__(codec.module.open(self._file, "rb"), buffer_size)
+        except Exception:
+            self._file.close()
+            raise
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._file.close()
+
+
+class BlockWriter(io.RawIOBase):
+    """Writes its input as independent compressed streams, each cut at a line end after BLOCK_BYTES."""
+
+    def __init__(self, path, codec, mode="wb", block_bytes=BLOCK_BYTES):
+        self._file = open(path, mode)
+        self._compress = codec.compress
+        self._block_bytes = block_bytes
+        self._buf = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._buf += b
+        if len(self._buf) >= self._block_bytes:
+            cut = self._buf.rfind(b"\n") + 1
+            if cut:
+                self._file.write(self._compress(bytes(self._buf[:cut])))
+                del self._buf[:cut]
+        return len(b)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buf:
+                self._file.write(self._compress(bytes(self._buf)))
+                self._buf.clear()
+        finally:
+            self._file.close()
+            super().close()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def sync(self):
+        """Write what is buffered as a stream of its own and fsync the file."""
+        if self._buf:
+            self._file.write(self._compress(bytes(self._buf)))
+            self._buf.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+def open_dat(path, mode="r", buffer_size=-1, codec=None):
+    """
+    Open a .dat file, compressed or not, like open().
+
+    mode is 'r', 'w' or 'a' (text, UTF-8, undecodable bytes ignored on
+    reading) or 'rb', 'wb' or 'ab'. The codec comes from the path's suffix
+    unless given ('gz', 'xz', 'bz2'; '' for none), e.g. for a '.part' file.
+    buffer_size -1 is open()'s default for plain files and BUFFER_SIZE for
+    compressed ones.
+    """
+    suffix = codec_suffix(path) if codec is None else ("." + codec if codec else "")
+    binary = "b" in mode
+    kind = mode.replace("b", "")
+
+    if not suffix:
+        if binary:
+            return open(path, mode, buffering=buffer_size)
+        if kind == "r":
+            return open(path, "r", encoding="utf-8", errors="ignore", buffering=buffer_size)
+        return open(path, kind, encoding="utf-8", buffering=buffer_size)
+
+    if buffer_size < 0:
+        buffer_size = BUFFER_SIZE
+    if kind == "r":
+        f = DecodedReader(path, CODECS[suffix], buffer_size)
+        return f if binary else io.TextIOWrapper(f, encoding="utf-8", errors="ignore")
+
+    f = io.BufferedWriter(BlockWriter(path, CODECS[suffix], kind + "b"), buffer_size)
+    return f if binary else io.TextIOWrapper(f, encoding="utf-8")
+
+
+def fsync_dat(f):
+    """Flush a file opened for writing with open_dat all the way to disk."""
+    f.flush()
+    raw = getattr(getattr(f, "buffer", f), "raw", None)
+    if isinstance(raw, BlockWriter):
+        raw.sync()
+    else:
+        os.fsync(f.fileno())
+
+
+# ---------- reading from the end ----------
+
+def iter_blocks_reverse(path, block_size=SEEK_BLOCK):
+    """
+    Yield the uncompressed content of a file in pieces, last piece first.
+
+    Joined in reverse order the pieces are the whole file, except for a
+    compressed file written as one stream: only its last TAIL_WINDOW bytes
+    are yielded (starting at a line start).
+    """
+    suffix = codec_suffix(path)
+    if suffix:
+        yield from _streams_reverse(path, CODECS[suffix])
+        return
+
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            yield f.read(step)
+
+
+def tail_bytes(path, n, start=0):
+    """
+    The last n uncompressed bytes of path, not reaching back before offset
+    start (for a compressed file that bound is only applied when the whole
+    file fits in the bytes read).
+    """
+    if not is_compressed(path):
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(min(max(size - n, start), size))
+            return f.read()
+
+    pieces = []
+    got = 0
+    for piece in iter_blocks_reverse(path):
+        pieces.append(piece)
+        got += len(piece)
+        if got >= n:
+            break
+    else:
+        n = min(n, got - start)
+
+    data = b"".join(reversed(pieces))
+    return data[len(data) - max(n, 0):]
+
+
+def _stream_starts(f, magic, end):
+    """Offsets of magic in f before end, last first (candidates for a stream start)."""
+    pos = end
+    overlap = b""
+    while pos > 0:
+        step = min(SEEK_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step) + overlap
+        i = chunk.rfind(magic)
+        while i >= 0:
+            yield pos + i
+            i = chunk.rfind(magic, 0, i)
+        overlap = chunk[:len(magic) - 1]
+
+
+def _decode_stream(codec, data):
+    """Decoded data if data is exactly one complete stream of at most MAX_STREAM_BYTES, else None."""
+    d = codec.decompressor()
+    try:
+        out = d.decompress(data, MAX_STREAM_BYTES + 1)
+    except (OSError, EOFError, ValueError, zlib.error, lzma.LZMAError):
+        return None
+    if not d.eof or d.unused_data or len(out) > MAX_STREAM_BYTES:
+        return None
+    return out
+
+
+def _decode_all(f, codec, end):
+    """Decode every stream in f[0:end], yielding pieces of the output in order."""
+    f.seek(0)
+    d = codec.decompressor()
+    left = end
+    while left > 0:
+        data = f.read(min(BUFFER_SIZE, left))
+        if not data:
+            break
+        left -= len(data)
+        while data:
+            yield d.decompress(data)
+            if not d.eof:
+                break
+            data = d.unused_data
+            d = codec.decompressor()
+
+
+def _streams_reverse(path, codec):
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+
+        while end > 0:
+            found = None
+            for start in _stream_starts(f, codec.magic, end):
+                if start == 0 or end - start > MAX_STREAM_BYTES:
+                    break
+                f.seek(start)
+                out = _decode_stream(codec, f.read(end - start))
+                if out is not None:
+                    found = start
+                    break
+            if found is None:
+                break
+            yield out
+            end = found
+
+        if end == 0:
+            return
+
+        # one stream from the start (or one too big to be ours): read it
+        # through once, keeping only the end
+        window = bytearray()
+        cut = False
+        for piece in _decode_all(f, codec, end):
+            window += piece
+            if len(window) > 2 * TAIL_WINDOW:
+                del window[:len(window) - TAIL_WINDOW]
+                cut = True
+        if cut:
+            del window[:window.find(b"\n") + 1]
+        yield bytes(window)
+
+
+def uncompressed_size(path):
+    """Uncompressed size of path (the file size for a plain file)."""
+    if not is_compressed(path):
+        return os.path.getsize(path)
+    size = 0
+    with open_dat(path, "rb") as f:
+        for chunk in iter(lambda: f.read(BUFFER_SIZE), b""):
+            size += len(chunk)
+    return size
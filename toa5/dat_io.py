@@ -0,0 +1,797 @@
+"""
+dat_io.py
+
+Shared file-reading helpers for TOA5 .dat files.
+
+The scanners and mergers only need the first and last timestamp of a file,
+so instead of readlines() on the whole file we read the head line by line
+and the tail backwards in fixed-size blocks from the end. Files are opened
+with compress.open_dat, so gzip/xz/bz2 .dat files work everywhere (see
+compress.py for how their tail is found).
+"""
+
+import os
+import heapq
+from contextlib import ExitStack
+from itertools import chain, islice, repeat
+from operator import itemgetter
+
+from toa5.compress import fsync_dat, is_compressed, iter_blocks_reverse, open_dat
+from toa5.tables import HEADER_LINES
+
+# Size of each backwards read when looking for the last row
+BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reverse(path, block_size=BLOCK_SIZE):
+    """
+    Yield the lines of a file from last to first (without line endings).
+
+    The file is read backwards in blocks of block_size bytes (a compressed
+    file one stream at a time), so finding the last few rows costs
+    O(block_size) regardless of the file size.
+    """
+    partial = b""
+
+    for block in iter_blocks_reverse(path, block_size):
+        chunk = block + partial
+
+        lines = chunk.split(b"\n")
+        # the first piece may be cut mid-line; keep it for the next block
+        partial = lines[0]
+        for ln in reversed(lines[1:]):
+            yield ln.rstrip(b"\r").decode("utf-8", errors="ignore")
+
+    yield partial.rstrip(b"\r").decode("utf-8", errors="ignore")
+
+
+def find_first_timestamp(path, parse_ts, header_lines=HEADER_LINES):
+    """Return the first parseable timestamp after the header, or None."""
+    with open_dat(path) as f:
+        for i, ln in enumerate(f):
+            if i < header_lines or not ln.strip():
+                continue
+            ts = parse_ts(ln.split(",")[0])
+            if ts:
+                return ts
+    return None
+
+
+def find_last_timestamp(path, parse_ts, block_size=BLOCK_SIZE):
+    """Return the last parseable timestamp in the file, or None."""
+    for ln in iter_lines_reverse(path, block_size):
+        if not ln.strip():
+            continue
+        ts = parse_ts(ln.split(",")[0])
+        if ts:
+            return ts
+    return None
+
+
+# ---------- field reconciliation ----------
+
+# Written for a field B has but A doesn't
+MISSING_VALUE = '"NAN"'
+
+
+def split_fields(line):
+    """Field names of a header line (line 2 of the TOA5 header), unquoted."""
+    return [v.strip().strip('"') for v in line.rstrip("\r\n").split(",")]
+
+
+def read_field_names(path):
+    with open_dat(path) as f:
+        f.readline()
+        return split_fields(f.readline())
+
+
+def field_differences(src_fields, dst_fields):
+    """Return (fields only in dst, fields only in src)."""
+    return (
+        [n for n in dst_fields if n not in src_fields],
+        [n for n in src_fields if n not in dst_fields],
+    )
+
+
+def make_reprojector(src_fields, dst_fields, missing=MISSING_VALUE):
+    """
+    Return a function that rewrites a data row laid out as src_fields into
+    dst_fields' column order, or None if the layouts already match.
+
+    The mapping is built once; each row then costs one split, one
+    itemgetter and one join. Fields dst has and src lacks get `missing`;
+    fields only src has are dropped. Values are split on bare commas, like
+    everywhere else here, so quoted values must not contain commas.
+    """
+    if src_fields == dst_fields:
+        return None
+
+    pos = {name: i for i, name in enumerate(src_fields)}
+    width = len(src_fields)
+    # index `width` is the placeholder appended to every row
+    pick = itemgetter(*[pos.get(name, width) for name in dst_fields], width)
+    filler = [missing] * width
+
+    def reproject(ln):
+        parts = ln.rstrip("\r\n").split(",")
+        if len(parts) != width:
+            # short or long row: pad with missing values / drop the extras
+            parts = (parts + filler)[:width]
+        parts.append(missing)
+        return ",".join(pick(parts)[:-1]) + "\n"
+
+    return reproject
+
+
+# ---------- streaming merge ----------
+
+# Output buffer for merged files
+WRITE_BUFFER = 1024 * 1024
+
+# Rows handed to writelines() at a time when copying without timestamps
+COPY_BATCH = 1000
+
+
+def open_output(out_path, buffer_size, checkpoint=None):
+    """out_path opened for writing, or with a checkpoint its .part file (see checkpoint.py)."""
+    if checkpoint is None:
+        return open_dat(out_path, "w", buffer_size)
+    return checkpoint.open_output(buffer_size)
+
+
+def open_input(path, checkpoint=None):
+    """path opened for reading its rows, or with a checkpoint through it (see checkpoint.py)."""
+    if checkpoint is None:
+        return open_dat(path)
+    return checkpoint.open_input(path)
+
+
+class OffsetReader:
+    """
+    A plain .dat file read as text lines, as open_dat(path) reads it, that
+    can tell where the last line read starts: a merge that has read one row
+    past its output carries on from start without losing or repeating a
+    row. The lines are decoded in C and start is only worked out when asked
+    for, from the file position. "\r\n" line ends are translated to "\n"
+    if the first line has one.
+    """
+
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        self.crlf = self.f.readline().endswith(b"\r\n")
+        self.seek(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # a checkpoint can still ask for start once the file is closed
+        try:
+            self.final = self.start
+        finally:
+            self.f.close()
+
+    def __iter__(self):
+        if self.crlf:
+            lines = self.translated()
+        else:
+            lines = map(bytes.decode, self.f, repeat("utf-8"), repeat("ignore"))
+        return chain(lines, self.at_end())
+
+    def translated(self):
+        for line in self.f:
+            line = line.decode("utf-8", "ignore")
+            yield line[:-2] + "\n" if line.endswith("\r\n") else line
+
+    def at_end(self):
+        self.ended = True
+        return
+        yield
+
+    def seek(self, offset):
+        self.f.seek(offset)
+        self.mark = offset
+        self.ended = False
+
+    @property
+    def start(self):
+        """Where the last line read starts; the end of the file once every line has been read."""
+        if self.f.closed:
+            return self.final
+        pos = self.f.tell()
+        if self.ended or pos == self.mark:
+            return pos
+
+        # back from the end of that line to the newline before it
+        start = self.mark
+        hi = pos - 1
+        while hi > self.mark:
+            lo = max(self.mark, hi - BLOCK_SIZE)
+            self.f.seek(lo)
+            nl = self.f.read(hi - lo).rfind(b"\n")
+            if nl >= 0:
+                start = lo + nl + 1
+                break
+            hi = lo
+        self.f.seek(pos)
+        return start
+
+
+class CountingReader(OffsetReader):
+    """
+    OffsetReader for a compressed .dat file. Its offsets are into the
+    decompressed text and are counted line by line as it is read, since a
+    compressed file can't be read backwards; seek() reads forward to one.
+    """
+
+    def __init__(self, path):
+        self.f = open_dat(path, "rb")
+        self.crlf = self.f.readline().endswith(b"\r\n")
+        self.seek(0)
+
+    def __iter__(self):
+        for line in self.f:
+            self.last = self.pos
+            self.pos += len(line)
+            line = line.decode("utf-8", "ignore")
+            yield line[:-2] + "\n" if self.crlf and line.endswith("\r\n") else line
+        self.last = self.pos
+
+    def seek(self, offset):
+        self.f.seek(offset)
+        self.pos = self.last = offset
+
+    @property
+    def start(self):
+        """Where the last line read starts; the end of the file once every line has been read."""
+        return self.last
+
+
+def resume_input(f, path, checkpoint):
+    """When resuming from checkpoint, move f to where path's rows continue; otherwise leave it be."""
+    if checkpoint is not None and checkpoint.resuming:
+        checkpoint.seek(f, path)
+
+
+def iter_data_rows(f, is_row):
+    """
+    Yield the data rows of an open file, one line at a time.
+    Blank lines and lines rejected by is_row are dropped; every yielded
+    row ends with a newline.
+    """
+    for ln in f:
+        if not ln.strip() or not is_row(ln):
+            continue
+        yield ln if ln.endswith("\n") else ln + "\n"
+
+
+def copy_rows(rows, out, counts, key, checkpoint=None):
+    """
+    Write every line of rows (an iterator) to out, COPY_BATCH lines at a
+    time, adding them to counts[key]; with a MergeCheckpoint, one is saved
+    every checkpoint.every rows or so.
+    """
+    since = 0
+    ahead = []
+    while True:
+        batch = ahead + list(islice(rows, COPY_BATCH))
+        if not batch:
+            return
+        out.writelines(batch)
+        counts[key] += len(batch)
+        since += len(batch)
+        ahead = []
+        if checkpoint is not None and since >= checkpoint.every:
+            since = 0
+            # one row read past the output, as the checkpoint expects
+            ahead = list(islice(rows, 1))
+            checkpoint.save(batch[-1], out)
+
+
+def stream_merge(a_file, b_file, out_path, is_row, is_row_b=None,
+                 buffer_size=WRITE_BUFFER, reproject_a=None, checkpoint=None):
+    """
+    Write B's header, then A's data rows, then B's data rows to out_path.
+
+    The header is everything in B before its first data row. Rows are
+    validated with is_row (is_row_b for B, if given) while they are copied,
+    and at most COPY_BATCH lines are held in memory at a time, so memory use
+    does not grow with the size of the inputs. If given, reproject_a
+    (see make_reprojector) puts each A row into B's field layout. With
+    checkpoint (a MergeCheckpoint for out_path) the output is written
+    crash-safely and an interrupted merge resumes where it stopped.
+    Returns (rows_from_a, rows_from_b).
+    """
+    if is_row_b is None:
+        is_row_b = is_row
+
+    rows = {"a": 0, "b": 0}
+    resuming = checkpoint is not None and checkpoint.resuming
+
+    with open_input(b_file, checkpoint) as fb, open_output(out_path, buffer_size, checkpoint) as out:
+        if checkpoint is not None:
+            checkpoint.track(rows=rows)
+
+        # header from B, up to (not including) its first data row
+        first_row = None
+        for ln in fb:
+            if ln.strip() and is_row_b(ln):
+                first_row = ln if ln.endswith("\n") else ln + "\n"
+                break
+            if not resuming:
+                out.write(ln)
+
+        with open_input(a_file, checkpoint) as fa:
+            resume_input(fa, a_file, checkpoint)
+            rows_a = iter_data_rows(fa, is_row)
+            if reproject_a is not None:
+                rows_a = map(reproject_a, rows_a)
+            copy_rows(rows_a, out, rows, "a", checkpoint)
+
+        if resuming:
+            checkpoint.seek(fb, b_file)
+            first_row = next(iter_data_rows(fb, is_row_b), None)
+
+        if first_row is not None:
+            copy_rows(chain([first_row], iter_data_rows(fb, is_row_b)), out, rows, "b", checkpoint)
+
+        if checkpoint is not None:
+            checkpoint.complete(out)
+
+    return rows["a"], rows["b"]
+
+
+# ---------- gap filling ----------
+
+def missing_intervals(last, ts, delta):
+    """Number of interval steps strictly between last and ts (0 if ts is the next one)."""
+    if ts <= last:
+        return 0
+    # ceil((ts - last) / delta) - 1, without stepping through the gap
+    return -((last - ts) // delta) - 1
+
+
+class GapFiller:
+    """
+    Placeholder rows for the intervals missing between consecutive output rows.
+
+    Called with each row (ts, line) just before it is written, it returns the
+    rows to write first: one per missing interval, the timestamp followed by
+    `missing` in every other field. The count comes from missing_intervals()
+    and the rows are generated lazily, so a months-long outage costs no
+    memory. Timestamps are written like the first row's (with or without
+    seconds).
+    """
+
+    def __init__(self, delta, width, missing=MISSING_VALUE):
+        self.delta = delta
+        self.filler = ("," + missing) * (width - 1) + "\n"
+        self.last = None
+        self.ts_len = 19
+        self.gaps = 0
+        self.rows = 0
+
+    def __call__(self, ts, ln):
+        last = self.last
+        if last is None:
+            self.ts_len = len(ln.split(",", 1)[0].strip().strip('"'))
+            self.last = ts
+            return ()
+        if ts <= last:
+            return ()
+        self.last = ts
+
+        n = missing_intervals(last, ts, self.delta)
+        if not n:
+            return ()
+        self.gaps += 1
+        self.rows += n
+        return self.gap_rows(last, n)
+
+    def gap_rows(self, start, n):
+        delta, filler, ts_len = self.delta, self.filler, self.ts_len
+        for k in range(1, n + 1):
+            yield '"' + (start + k * delta).isoformat(sep=" ")[:ts_len] + '"' + filler
+
+
+def row_writer(out, fill=None, checkpoint=None):
+    """
+    write(ts, line) for out; with a GapFiller, missing intervals are written
+    first, and with a MergeCheckpoint one is saved every checkpoint.every rows.
+    The checkpoint expects every input to have been read exactly one row
+    past the output (or to its end), so callers read their next row before
+    writing the current one.
+    """
+    if checkpoint is None:
+        if fill is None:
+            return lambda ts, ln: out.write(ln)
+
+        def write(ts, ln):
+            out.writelines(fill(ts, ln))
+            out.write(ln)
+
+        return write
+
+    every = checkpoint.every
+    left = every
+
+    def write_checkpointed(ts, ln):
+        nonlocal left
+        if fill is not None:
+            out.writelines(fill(ts, ln))
+        out.write(ln)
+        left -= 1
+        if not left:
+            left = every
+            checkpoint.save(ln, out)
+
+    return write_checkpointed
+
+
+# ---------- overlap-resolving merge ----------
+
+# Which row to keep when A and B both have a timestamp
+OVERLAP_MODES = ("prefer-a", "prefer-b", "prefer-valid")
+
+
+def iter_timed_rows(f, row_ts):
+    """Yield (timestamp, line) for the data rows of an open file."""
+    for ln in f:
+        if not ln.strip():
+            continue
+        ts = row_ts(ln)
+        if ts is None:
+            continue
+        yield ts, ln if ln.endswith("\n") else ln + "\n"
+
+
+def pick_row(line_a, line_b, prefer):
+    """Return (kept_line, from_a) for a timestamp present in both files."""
+    if prefer == "prefer-a":
+        return line_a, True
+    if prefer == "prefer-b":
+        return line_b, False
+    # prefer-valid: the row with fewer NAN fields wins, B on a tie
+    if line_a.count("NAN") < line_b.count("NAN"):
+        return line_a, True
+    return line_b, False
+
+
+def stream_interleave(a_file, b_file, out_path, row_ts, row_ts_b=None,
+                      prefer="prefer-b", buffer_size=WRITE_BUFFER, reproject_a=None, fill=None,
+                      checkpoint=None):
+    """
+    Merge A and B by timestamp into out_path in one streaming pass.
+
+    Used when B overlaps A. Both files must already be in time order; rows
+    are taken from whichever file has the earlier timestamp, and for a
+    timestamp present in both, prefer decides which row is kept (see
+    OVERLAP_MODES). B's header is written once at the top, and A rows are
+    put into its field layout with reproject_a if given. With fill (a
+    GapFiller), placeholder rows are written for missing intervals, and with
+    checkpoint the merge is resumable as for stream_merge. Only the current
+    row of each file is held in memory.
+
+    Returns a dict with rows written from each file, the number of
+    timestamps found in both, and how many of those had a different row
+    replaced by the one kept.
+    """
+    if prefer not in OVERLAP_MODES:
+        raise ValueError(f"Unknown overlap mode {prefer!r}; expected one of {OVERLAP_MODES}")
+    if row_ts_b is None:
+        row_ts_b = row_ts
+
+    stats = {"from_a": 0, "from_b": 0, "overlap": 0, "replaced": 0}
+    resuming = checkpoint is not None and checkpoint.resuming
+
+    with open_input(b_file, checkpoint) as fb, open_input(a_file, checkpoint) as fa, \
+            open_output(out_path, buffer_size, checkpoint) as out:
+
+        # header from B, up to (not including) its first data row
+        first_b = None
+        for ln in fb:
+            ts = row_ts_b(ln) if ln.strip() else None
+            if ts is not None:
+                first_b = (ts, ln if ln.endswith("\n") else ln + "\n")
+                break
+            if not resuming:
+                out.write(ln)
+
+        resume_input(fa, a_file, checkpoint)
+        rows_a = iter_timed_rows(fa, row_ts)
+        if reproject_a is not None:
+            rows_a = ((ts, reproject_a(ln)) for ts, ln in rows_a)
+        rows_b = iter_timed_rows(fb, row_ts_b)
+        write = row_writer(out, fill, checkpoint)
+        if checkpoint is not None:
+            checkpoint.track(fill, stats=stats)
+
+        a = next(rows_a, None)
+        b = first_b
+        if resuming:
+            checkpoint.seek(fb, b_file)
+            b = next(rows_b, None)
+
+        # each row is written after the next one of its file is read (see row_writer)
+        while a is not None and b is not None:
+            if a[0] < b[0]:
+                stats["from_a"] += 1
+                row, a = a, next(rows_a, None)
+                write(*row)
+            elif b[0] < a[0]:
+                stats["from_b"] += 1
+                row, b = b, next(rows_b, None)
+                write(*row)
+            else:
+                kept, from_a = pick_row(a[1], b[1], prefer)
+                stats["from_a" if from_a else "from_b"] += 1
+                stats["overlap"] += 1
+                if a[1] != b[1]:
+                    stats["replaced"] += 1
+                ts = a[0]
+                a = next(rows_a, None)
+                b = next(rows_b, None)
+                write(ts, kept)
+
+        while a is not None:
+            stats["from_a"] += 1
+            row, a = a, next(rows_a, None)
+            write(*row)
+
+        while b is not None:
+            stats["from_b"] += 1
+            row, b = b, next(rows_b, None)
+            write(*row)
+
+        if checkpoint is not None:
+            checkpoint.complete(out)
+
+    return stats
+
+
+# ---------- k-way merge of many fragments ----------
+
+def read_fragment_start(f, row_ts):
+    """Read the header of an open file; return (header_lines, (ts, first_row)) or (header_lines, None)."""
+    header = []
+    for ln in f:
+        ts = row_ts(ln) if ln.strip() else None
+        if ts is not None:
+            return header, (ts, ln if ln.endswith("\n") else ln + "\n")
+        header.append(ln)
+    return header, None
+
+
+def iter_fragment(order, first, f, row_ts, reproject=None):
+    if reproject is None:
+        yield first[0], order, first[1]
+        for ts, ln in iter_timed_rows(f, row_ts):
+            yield ts, order, ln
+        return
+
+    yield first[0], order, reproject(first[1])
+    for ts, ln in iter_timed_rows(f, row_ts):
+        yield ts, order, reproject(ln)
+
+
+def stream_kway_merge(paths, out_path, make_row_ts, prefer="prefer-b", delta=None,
+                      buffer_size=WRITE_BUFFER, reconcile=False, fill=None, checkpoint=None,
+                      header_path=None):
+    """
+    Merge any number of fragments of one table into out_path in one pass.
+
+    Fragments are ordered by their first timestamp and their rows merged
+    with a heap, so only the current row of each file is in memory. Each
+    file must be in time order. Rows sharing a timestamp are collapsed to
+    one, chosen with pick_row() treating the earlier-starting fragment as
+    "A". The header comes from header_path if given (it must be one of
+    paths), else from the fragment that starts last (the newest logger
+    program). With reconcile, rows of fragments whose field list
+    differs from that header are reprojected into it (make_reprojector), and
+    with fill (a GapFiller) missing intervals get placeholder rows. With
+    checkpoint the merge is resumable as for stream_merge. make_row_ts()
+    must return a fresh line -> timestamp function, one per file.
+
+    Returns a dict: rows written, rows kept per fragment path, duplicates
+    dropped, empty fragments, and (if delta is given) gaps and backwards
+    steps seen in the output. If every fragment is empty nothing is
+    written, not even the header, and rows is 0.
+    """
+    if prefer not in OVERLAP_MODES:
+        raise ValueError(f"Unknown overlap mode {prefer!r}; expected one of {OVERLAP_MODES}")
+
+    stats = {"rows": 0, "duplicates": 0, "empty": [], "gaps": 0, "backwards": 0, "per_file": {}}
+
+    with ExitStack() as stack:
+        frags = []
+        headers = {}
+        for path in paths:
+            f = stack.enter_context(open_input(path, checkpoint))
+            row_ts = make_row_ts()
+            header, first = read_fragment_start(f, row_ts)
+            headers[path] = header
+            if first is None:
+                stats["empty"].append(path)
+                continue
+            frags.append((first[0], path, header, first, f, row_ts))
+
+        if not frags:
+            return stats
+
+        frags.sort(key=lambda fr: fr[0])
+        header = headers[header_path] if header_path is not None else frags[-1][2]
+        paths_in_order = [fr[1] for fr in frags]
+        kept = [0] * len(frags)
+
+        # resuming: the order above still comes from each fragment's first
+        # row; then every fragment continues after the checkpoint
+        resuming = checkpoint is not None and checkpoint.resuming
+        if resuming:
+            for fr in frags:
+                checkpoint.seek(fr[4], fr[1])
+            frags = [fr[:3] + (next(iter_timed_rows(fr[4], fr[5]), None),) + fr[4:] for fr in frags]
+
+        reprojectors = [None] * len(frags)
+        if reconcile:
+            target = split_fields(header[1]) if len(header) > 1 else None
+            for i, fr in enumerate(frags):
+                if target is not None and len(fr[2]) > 1:
+                    reprojectors[i] = make_reprojector(split_fields(fr[2][1]), target)
+
+        merged = heapq.merge(*(
+            iter_fragment(i, fr[3], fr[4], fr[5], reprojectors[i])
+            for i, fr in enumerate(frags) if fr[3] is not None
+        ))
+
+        with open_output(out_path, buffer_size, checkpoint) as out:
+            if not resuming:
+                out.writelines(header)
+            write = row_writer(out, fill, checkpoint)
+            if checkpoint is not None:
+                checkpoint.track(fill, stats=stats, kept=kept)
+
+            last_ts = checkpoint.last_ts if resuming else None
+            pending = None
+            for ts, order, ln in merged:
+                if pending is not None and ts == pending[0]:
+                    stats["duplicates"] += 1
+                    line, from_a = pick_row(pending[2], ln, prefer)
+                    pending = (ts, pending[1] if from_a else order, line)
+                    continue
+
+                # written once the next row is read (see row_writer)
+                done, pending = pending, (ts, order, ln)
+                if done is not None:
+                    kept[done[1]] += 1
+                    write(done[0], done[2])
+                    last_ts = done[0]
+
+                if delta is not None and last_ts is not None:
+                    if ts - last_ts > delta:
+                        stats["gaps"] += 1
+                    elif ts < last_ts:
+                        stats["backwards"] += 1
+
+            if pending is not None:
+                kept[pending[1]] += 1
+                write(pending[0], pending[2])
+
+            if checkpoint is not None:
+                checkpoint.complete(out)
+
+    stats["rows"] = sum(kept)
+    stats["per_file"] = dict(zip(paths_in_order, kept))
+    return stats
+
+
+# ---------- incremental append ----------
+
+# Chunk size when copying the new tail of a source file
+COPY_CHUNK = 1024 * 1024
+
+
+def row_at_or_after(f, pos, row_ts):
+    """
+    In a binary file, return (line_start, ts) of the first data row starting
+    at or after byte pos, or (None, None) at EOF.
+    """
+    f.seek(max(pos - 1, 0))
+    if pos > 0 and f.read(1) != b"\n":
+        f.readline()  # pos is mid-line; move to the start of the next one
+
+    while True:
+        start = f.tell()
+        ln = f.readline()
+        if not ln:
+            return None, None
+        if ln.strip():
+            ts = row_ts(ln.decode("utf-8", errors="ignore"))
+            if ts is not None:
+                return start, ts
+
+
+def find_offset_after(path, after, row_ts, header_lines=HEADER_LINES):
+    """
+    Binary-search a time-ordered .dat file for the first row newer than `after`.
+
+    Only O(log file size) lines are read. Returns (offset, ts) of that row,
+    or (None, None) if the file has nothing newer. A compressed file can't
+    be sought backwards cheaply, so it is read forwards instead, and its
+    offsets are positions in the uncompressed data.
+    """
+    if is_compressed(path):
+        return scan_offset_after(path, after, row_ts, header_lines)
+
+    with open(path, "rb") as f:
+        for _ in range(header_lines):
+            f.readline()
+        lo = f.tell()
+        hi = os.fstat(f.fileno()).st_size
+
+        # smallest position whose next row is newer than `after` (or EOF)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, ts = row_at_or_after(f, mid, row_ts)
+            if ts is None or ts > after:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        return row_at_or_after(f, lo, row_ts)
+
+
+def scan_offset_after(path, after, row_ts, header_lines=HEADER_LINES):
+    """find_offset_after by reading forwards, for files that can't be sought."""
+    with open_dat(path, "rb") as f:
+        offset = sum(len(f.readline()) for _ in range(header_lines))
+        for ln in f:
+            if ln.strip():
+                ts = row_ts(ln.decode("utf-8", errors="ignore"))
+                if ts is not None and ts > after:
+                    return offset, ts
+            offset += len(ln)
+    return None, None
+
+
+def read_header_lines(path, header_lines=HEADER_LINES):
+    with open_dat(path, "rb") as f:
+        return [f.readline() for _ in range(header_lines)]
+
+
+def ends_with_newline(path):
+    """True if the file's (uncompressed) data ends with a newline, or is empty."""
+    for block in iter_blocks_reverse(path, 1):
+        if block:
+            return block.endswith(b"\n")
+    return True
+
+
+def append_tail(src_path, offset, out_path, chunk_size=COPY_CHUNK):
+    """
+    Append the complete lines of src_path from offset onwards onto out_path.
+
+    A last line without a newline is a row the logger (or a download) is
+    still writing, so it is left for the next append. Either file may be
+    compressed; a compressed out_path gets the rows as new streams.
+    Returns (bytes_appended, rows_appended).
+    """
+    copied = 0
+    rows = 0
+    newline = b"" if ends_with_newline(out_path) else b"\n"
+
+    with open_dat(src_path, "rb") as src, open_dat(out_path, "ab") as out:
+        src.seek(offset)
+        partial = b""
+        for chunk in iter(lambda: src.read(chunk_size), b""):
+            chunk = partial + chunk
+            end = chunk.rfind(b"\n") + 1
+            partial = chunk[end:]
+            if not end:
+                continue
+            out.write(newline + chunk[:end])
+            newline = b""
+            copied += end
+            rows += chunk.count(b"\n", 0, end)
+        fsync_dat(out)
+
+    return copied, rows
@@ -0,0 +1,536 @@
+import argparse
+import requests
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from toa5.catalog import Catalog
+from toa5.compress import (
+    CODEC_NAMES, fsync_dat, is_compressed, open_dat, tail_bytes, uncompressed_size, with_codec,
+)
+
+API_BASE = "http://192.168.0.65:3000/api"
+
+# Bytes per read from the response; each file is streamed to disk, never held whole
+CHUNK_SIZE = 256 * 1024
+TIMEOUT = 60
+
+# Bytes re-fetched before the local end in --sync mode, to check the local copy still matches
+SYNC_OVERLAP = 4096
+
+# Per-folder record of what was downloaded, used to skip unchanged files
+MANIFEST_NAME = ".download_manifest.json"
+
+# Listing fields that identify a server-side version of a file
+SERVER_KEYS = ("size", "mtime", "etag")
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Download all files for a given station (or many stations) from the API"
+    )
+    parser.add_argument(
+        "station",
+        nargs="?",
+        help="Station name or code (e.g. ST31, Masaiti, Lukulu)"
+    )
+    parser.add_argument(
+        "folder",
+        nargs="?",
+        help="Destination folder name (e.g. Lukulu)"
+    )
+    parser.add_argument(
+        "--stations",
+        nargs="+",
+        help="Bulk mode: several stations, each downloaded into <dest-root>/<station>"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Bulk mode: every station found in the file listing"
+    )
+    parser.add_argument(
+        "--dest-root",
+        help="Parent folder for the per-station folders in bulk mode"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Number of files downloaded in parallel (default 4)"
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Only fetch the new tail of files that already exist locally (HTTP Range)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the download manifest and fetch every file"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=CODEC_NAMES,
+        default="",
+        help="Store plain .dat files gzip/xz/bz2-compressed (name.dat.gz etc.); --sync still appends"
+    )
+    parser.add_argument(
+        "--api",
+        default=API_BASE,
+        help=f"API base URL (default {API_BASE})"
+    )
+
+    args = parser.parse_args(argv)
+    station = args.station
+    folder = args.folder
+    api_base = args.api.rstrip("/")
+
+    bulk = args.all or args.stations
+    if bulk and not args.dest_root:
+        parser.error("--stations/--all need --dest-root")
+    if not bulk and not (station and folder):
+        parser.error("give a station and folder, or --stations/--all with --dest-root")
+
+    # one pooled session for the listing and every download
+    session = make_session(args.jobs)
+
+    # ---------------- Fetch file list ----------------
+    try:
+        response = session.get(f"{api_base}/files", timeout=TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        files = data.get("files", [])
+    except requests.RequestException as e:
+        print(f"❌ Error fetching file list: {e}")
+        return
+
+    # ---------------- Filter station files ----------------
+    # station_files = [
+    #     f["name"]
+    #     for f in files
+    #     if station in f["name"]
+    # ]
+
+
+
+    # server-side metadata (size, mtime, etag) when the listing has it
+    listing = {f["name"]: f for f in files}
+
+    if bulk:
+        download_stations(args, files, listing, session, api_base)
+        session.close()
+        return
+
+    station_files = files_for_station(station, build_station_index(files), files)
+
+    if not station_files:
+        print(f"⚠️ No files found for station '{station}'")
+        return
+
+    # ---------------- Create destination folder ----------------
+    try:
+        os.makedirs(folder, exist_ok=True)
+    except OSError as e:
+        print(f"❌ Error creating folder '{folder}': {e}")
+        return
+
+    # ---------------- Download files ----------------
+    print(f"\n📥 Downloading {len(station_files)} files for station '{station}' ({args.jobs} at a time)\n")
+
+    download_all(
+        station_files, folder, jobs=args.jobs, api_base=api_base, session=session,
+        sync=args.sync, listing=listing, use_manifest=not args.force, compress=args.compress,
+    )
+    session.close()
+
+
+def build_station_index(files):
+    """Catalog of the listing's filenames, each parsed once (see catalog.py)."""
+    return Catalog(f["name"] for f in files)
+
+
+def files_for_station(station, catalog, files):
+    key = station.lower()
+    names = catalog.station_files(key)
+    if not names:
+        # not a station name (e.g. a code inside the name): fall back to a substring match
+        return [f["name"] for f in files if key in f["name"].lower()]
+
+    # names the catalog can't parse are still fetched if they mention the station
+    odd = [n for n in catalog.unknown if key in n.lower()]
+    if odd:
+        print(f"⚠️ Unrecognised file name(s) for '{station}', downloaded as-is: {', '.join(odd)}")
+    return names + odd
+
+
+def download_stations(args, files, listing, session, api_base):
+    """Bulk mode: every requested station's files through one shared download queue."""
+    catalog = build_station_index(files)
+    if args.all:
+        stations = catalog.stations()
+        stray = [n for n in catalog.unknown if not any(s.lower() in n.lower() for s in stations)]
+        if stray:
+            print(f"⚠️ {len(stray)} file(s) with unrecognised names belong to no station, skipped:")
+            for name in stray:
+                print(f"    {name}")
+    else:
+        stations = args.stations
+
+    items = []
+    for station in stations:
+        names = files_for_station(station, catalog, files)
+        if not names:
+            print(f"⚠️ No files found for station '{station}'")
+            continue
+
+        # folder named as in the filenames, whatever case the station was typed in
+        if catalog.station_files(station):
+            station = catalog.by_name[names[0]].station
+        folder = os.path.join(args.dest_root, station)
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError as e:
+            print(f"❌ Error creating folder '{folder}': {e}")
+            continue
+
+        print(f"  {station:<20} {len(names)} file(s) → {folder}")
+        items.extend((name, folder) for name in names)
+
+    if not items:
+        return
+
+    print(f"\n📥 Downloading {len(items)} files for {len(stations)} station(s) ({args.jobs} at a time)\n")
+    download_many(
+        items, jobs=args.jobs, api_base=api_base, session=session,
+        sync=args.sync, listing=listing, use_manifest=not args.force, compress=args.compress,
+    )
+
+
+def make_session(pool_size):
+    """A Session whose connection pool is big enough for pool_size threads."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def format_rate(nbytes, seconds):
+    return f"{nbytes / 1e6:.2f} MB in {seconds:.1f} s ({nbytes / 1e6 / max(seconds, 1e-6):.2f} MB/s)"
+
+
+def download_all(filenames, dest_dir, **kwargs):
+    """Download filenames into dest_dir; see download_many for the options."""
+    return download_many([(name, dest_dir) for name in filenames], **kwargs)
+
+
+def download_many(items, jobs=4, api_base=API_BASE, session=None,
+                  sync=False, listing=None, use_manifest=True, compress=""):
+    """
+    Download (filename, dest_dir) items, jobs at a time over one pooled session.
+
+    listing maps name -> the /api/files entry. With use_manifest, files
+    whose listing metadata matches the manifest (and whose local copy is
+    untouched) are skipped without any request. With sync, files that exist
+    locally only get their new tail (see sync_file). With compress ('gz',
+    'xz', 'bz2') plain files are stored compressed (see local_name).
+    Returns the list of per-file results (None for failures and skips).
+    """
+    t0 = time.perf_counter()
+    session = session or make_session(jobs)
+    listing = listing or {}
+
+    # one manifest per destination folder
+    manifests = {
+        dest_dir: load_manifest(dest_dir) if use_manifest else {}
+        for dest_dir in {d for _, d in items}
+    }
+
+    skipped = [
+        (name, d) for name, d in items
+        if is_unchanged(name, listing.get(name, {}), manifests[d], d, compress)
+    ]
+    todo = [item for item in items if item not in skipped]
+    # bytes the server would have sent (a compressed copy is smaller on disk)
+    saved = sum(
+        manifests[d][name].get("data_size") or manifests[d][name]["local_size"] for name, d in skipped
+    )
+    for name, _ in skipped:
+        print(f"= {name}  unchanged, skipped")
+
+    def fetch(item):
+        name, dest_dir = item
+        if sync:
+            data_size = known_data_size(manifests[dest_dir].get(name), dest_dir, name, compress)
+            return sync_file(name, dest_dir, session, api_base, listing.get(name, {}).get("size"),
+                             compress, data_size)
+        return download_file(name, dest_dir, session, api_base, compress)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(fetch, todo))
+
+    for (name, dest_dir), res in zip(todo, results):
+        if res:
+            # fewer bytes sent than the file holds: a --sync append, not re-hashed
+            record_download(manifests[dest_dir], name, listing.get(name, {}), dest_dir, etag=res[3],
+                            compress=compress, data_size=res[2], rehash=res[0] >= res[2])
+    for dest_dir, manifest in manifests.items():
+        save_manifest(dest_dir, manifest)
+
+    elapsed = time.perf_counter() - t0
+    ok = [r for r in results if r]
+    transferred = sum(r[0] for r in ok)
+    saved += sum(r[2] - r[0] for r in ok if r[2] > r[0])
+
+    print(
+        f"\n✅ Download complete: {len(ok)}/{len(todo)} files fetched, {len(skipped)} unchanged, "
+        f"{format_rate(transferred, elapsed)}"
+    )
+    if saved:
+        print(f"   {saved / 1e6:.2f} MB saved (not re-downloaded)")
+    return results
+
+
+# ---------------- Manifest ----------------
+
+def load_manifest(dest_dir):
+    try:
+        with open(os.path.join(dest_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(dest_dir, manifest):
+    path = os.path.join(dest_dir, MANIFEST_NAME)
+    with open(path + ".part", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".part", path)
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def server_version(entry):
+    return {k: entry[k] for k in SERVER_KEYS if entry.get(k) is not None}
+
+
+def local_name(name, compress=""):
+    """Name a server file is stored under: with compress, plain files get its suffix ('a.dat.gz')."""
+    if compress and not is_compressed(name):
+        return with_codec(name, compress)
+    return name
+
+
+def record_download(manifest, name, entry, dest_dir, etag=None, compress="", data_size=None,
+                    rehash=True):
+    """
+    Remember the server version and local state of a file just fetched.
+    For a file stored compressed, data_size (its size on the server) is kept
+    too, so --sync knows where to resume without decompressing it. Without
+    rehash (after a --sync append, whose boundary was already checked) the
+    whole file isn't read again for its sha256; size and mtime identify it.
+    """
+    path = os.path.join(dest_dir, local_name(name, compress))
+    st = os.stat(path)
+    server = server_version(entry)
+    if etag and "etag" not in server:
+        server["etag"] = etag
+    manifest[name] = {
+        "server": server,
+        "local_size": st.st_size,
+        "local_mtime_ns": st.st_mtime_ns,
+        "sha256": file_sha256(path) if rehash else None,
+    }
+    if local_name(name, compress) != name:
+        manifest[name]["data_size"] = data_size
+
+
+def known_data_size(rec, dest_dir, name, compress=""):
+    """The manifest's data_size for a compressed local copy, if the copy is still the one recorded."""
+    path = os.path.join(dest_dir, local_name(name, compress))
+    try:
+        if rec and rec.get("data_size") is not None and os.path.getsize(path) == rec["local_size"]:
+            return rec["data_size"]
+    except OSError:
+        pass
+    return None
+
+
+def is_unchanged(name, entry, manifest, dest_dir, compress=""):
+    """
+    True if the listing entry matches what we last downloaded and the local
+    copy is still the one we wrote. Listings without size/mtime/etag never match.
+    """
+    rec = manifest.get(name)
+    server = server_version(entry)
+    if not rec or not server:
+        return False
+    if any(rec["server"].get(k) != v for k, v in server.items()):
+        return False
+
+    path = os.path.join(dest_dir, local_name(name, compress))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    if st.st_size != rec["local_size"]:
+        return False
+    if st.st_mtime_ns == rec["local_mtime_ns"]:
+        return True
+    # touched locally: trust it only if the content is still the same
+    if rec.get("sha256") is None or file_sha256(path) != rec["sha256"]:
+        return False
+    rec["local_mtime_ns"] = st.st_mtime_ns
+    return True
+
+
+def download_file(filename, dest_dir, session=None, api_base=API_BASE, compress=""):
+    """
+    Stream one file to dest_dir/<filename>.part and rename it into place when complete,
+    so an interrupted download never leaves a truncated .dat behind. With
+    compress it is compressed on the way (see local_name).
+    Returns (bytes transferred, seconds, file size on the server, etag), or None on failure.
+    """
+    url = f"{api_base}/download/{quote(filename)}"
+    local = local_name(filename, compress)
+    dest_path = os.path.join(dest_dir, local)
+    tmp_path = dest_path + ".part"
+    http = session or requests
+
+    t0 = time.perf_counter()
+    nbytes = 0
+
+    try:
+        with http.get(url, stream=True, timeout=TIMEOUT) as response:
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+
+            # the .part suffix hides the codec from open_dat, so name it
+            with open_dat(tmp_path, "wb", codec=compress if local != filename else "") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    nbytes += len(chunk)
+                fsync_dat(f)
+
+        os.replace(tmp_path, dest_path)
+
+    except requests.RequestException as e:
+        print(f"❌ Download failed: {filename} → {e}")
+        remove_quietly(tmp_path)
+        return None
+    except IOError as e:
+        print(f"❌ File write error: {filename} → {e}")
+        remove_quietly(tmp_path)
+        return None
+
+    elapsed = time.perf_counter() - t0
+    print(f"✔ {filename}  {format_rate(nbytes, elapsed)}")
+    return nbytes, elapsed, nbytes, etag
+
+
+def sync_file(filename, dest_dir, session=None, api_base=API_BASE, server_size=None,
+              compress="", data_size=None):
+    """
+    Bring a local copy of a growing .dat file up to date with a Range request.
+
+    The request starts SYNC_OVERLAP bytes before the local end; those bytes
+    must match the local tail before the rest is appended. Anything
+    unexpected (no local file, server copy smaller, boundary mismatch,
+    server ignoring Range) falls back to a full download. A copy stored
+    compressed is compared and extended in its uncompressed form; its size
+    is data_size, from the manifest (else it is decompressed to find out).
+    Returns (bytes transferred, seconds, file size on the server, etag), or None on failure.
+    """
+    packed = local_name(filename, compress) != filename
+    dest_path = os.path.join(dest_dir, local_name(filename, compress))
+    if not os.path.exists(dest_path):
+        return download_file(filename, dest_dir, session, api_base, compress)
+
+    if packed:
+        local_size = data_size if data_size is not None else uncompressed_size(dest_path)
+    else:
+        local_size = os.path.getsize(dest_path)
+    if server_size is not None and server_size < local_size:
+        print(f"↻ {filename}: server copy is smaller — downloading again")
+        return download_file(filename, dest_dir, session, api_base, compress)
+
+    url = f"{api_base}/download/{quote(filename)}"
+    start = max(local_size - SYNC_OVERLAP, 0)
+    http = session or requests
+
+    t0 = time.perf_counter()
+    nbytes = 0
+
+    try:
+        with http.get(url, headers={"Range": f"bytes={start}-"}, stream=True, timeout=TIMEOUT) as response:
+            etag = response.headers.get("ETag")
+            if response.status_code != 206:
+                # 200: Range not supported; 416: server file shorter than our copy
+                print(f"↻ {filename}: no partial content (HTTP {response.status_code}) — downloading again")
+                response.close()
+                return download_file(filename, dest_dir, session, api_base, compress)
+
+            chunks = response.iter_content(CHUNK_SIZE)
+
+            # the overlap must match what we already have
+            boundary = b""
+            want = local_size - start
+            for chunk in chunks:
+                boundary += chunk
+                if len(boundary) >= want:
+                    break
+            nbytes += len(boundary)
+
+            if packed:
+                local_tail = tail_bytes(dest_path, want)
+            else:
+                with open(dest_path, "rb") as f:
+                    f.seek(start)
+                    local_tail = f.read(want)
+
+            if boundary[:want] != local_tail:
+                print(f"↻ {filename}: local copy differs from the server — downloading again")
+                response.close()
+                return download_file(filename, dest_dir, session, api_base, compress)
+
+            added = len(boundary) - want
+            with open_dat(dest_path, "ab", codec=compress if packed else "") as f:
+                f.write(boundary[want:])
+                for chunk in chunks:
+                    f.write(chunk)
+                    nbytes += len(chunk)
+                    added += len(chunk)
+                fsync_dat(f)
+
+    except requests.RequestException as e:
+        print(f"❌ Sync failed: {filename} → {e}")
+        return None
+    except IOError as e:
+        print(f"❌ File write error: {filename} → {e}")
+        return None
+
+    elapsed = time.perf_counter() - t0
+    new_size = local_size + added
+    print(f"↻ {filename}  +{added} bytes, {format_rate(nbytes, elapsed)}")
+    return nbytes, elapsed, new_size, etag
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+gui.py
+
+The few Tk dialogs the scan and compare tools use when no folder is given
+on the command line. tkinter is imported on first use only, so headless
+runs never load it and don't need a display.
+"""
+
+_root = None
+
+
+def tk_root():
+    global _root
+    if _root is None:
+        import tkinter as tk
+
+        _root = tk.Tk()
+        _root.withdraw()
+    return _root
+
+
+def ask_directory(title):
+    from tkinter import filedialog
+
+    tk_root()
+    return filedialog.askdirectory(title=title)
+
+
+def show_error(title, message):
+    from tkinter import messagebox
+
+    tk_root()
+    messagebox.showerror(title, message)
+
+
+def show_info(title, message):
+    from tkinter import messagebox
+
+    tk_root()
+    messagebox.showinfo(title, message)
+
+
+def ask_yes_no(title, message):
+    from tkinter import messagebox
+
+    tk_root()
+    return messagebox.askyesno(title, message)
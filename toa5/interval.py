@@ -0,0 +1,141 @@
+"""
+interval.py
+
+Recording interval of a table that is not listed in FREQ_MAP.
+
+New logger programs add tables (Table5m, Table30m, ...) faster than
+FREQ_MAP is updated. For those the interval is inferred from a sample:
+only the first and last SAMPLE_BYTES of the file are read, and the most
+common step between consecutive timestamps in each is taken. When the
+TOA5 table name in header line 1 states an interval ("Table10m",
+"TableHour", "Table30min") the two must agree. Results are cached per
+(station, table) for the rest of the run.
+
+    delta, source = table_interval([a_file, b_file])
+"""
+
+import os
+import re
+from collections import Counter
+from datetime import timedelta
+
+from toa5.catalog import parse_name
+from toa5.compress import open_dat, tail_bytes
+from toa5.dat_io import split_fields
+from toa5.tables import FREQ_MAP, HEADER_LINES, TS_FORMATS, detect_suffix
+from toa5.ts_parser import TimestampParser
+
+# Bytes read from each end of the file
+SAMPLE_BYTES = 16 * 1024
+
+# Fewer steps than this in the sample and the mode isn't trusted
+MIN_STEPS = 3
+
+# interval stated at the end of a table name: 10m, 30min, 5s, 1h, Hour, Day
+NAME_INTERVAL_RE = re.compile(
+    r"(?:(\d+)_?(s|sec|m|min|mins|h|hr|d)|(hour|hourly|day|daily))$", re.IGNORECASE
+)
+UNITS = {
+    "s": "seconds", "sec": "seconds",
+    "m": "minutes", "min": "minutes", "mins": "minutes",
+    "h": "hours", "hr": "hours", "hour": "hours", "hourly": "hours",
+    "d": "days", "day": "days", "daily": "days",
+}
+
+_cache = {}
+
+
+def interval_from_name(table):
+    """Interval a table name states, e.g. 'Table10m' -> 10 minutes, or None."""
+    m = NAME_INTERVAL_RE.search(table or "")
+    if not m:
+        return None
+    if m.group(3):
+        return timedelta(**{UNITS[m.group(3).lower()]: 1})
+    return timedelta(**{UNITS[m.group(2).lower()]: int(m.group(1))})
+
+
+def sample_lines(path, nbytes=SAMPLE_BYTES):
+    """
+    Return (header_lines, head_rows, tail_rows): the header, and the complete
+    lines within nbytes after it and within nbytes of the end of the file.
+    """
+    with open_dat(path, "rb") as f:
+        header = [f.readline() for _ in range(HEADER_LINES)]
+        head_end = f.tell()
+        head = f.read(nbytes)
+        head_end += len(head)
+        more = f.read(1) != b""
+
+    head_rows = head.split(b"\n")
+    tail_rows = []
+    if more:
+        head_rows.pop()  # cut mid-line
+        tail = tail_bytes(path, nbytes, start=head_end)
+        tail_rows = tail.split(b"\n")[1:]  # the first may be cut mid-line
+
+    def text(lines):
+        return [ln.decode("utf-8", errors="ignore") for ln in lines if ln.strip()]
+
+    return text(header), text(head_rows), text(tail_rows)
+
+
+def mode_step(*samples):
+    """Most common forward step between consecutive timestamps, or None if too few."""
+    counts = Counter()
+    for stamps in samples:
+        counts.update(b - a for a, b in zip(stamps, stamps[1:]) if b > a)
+    if sum(counts.values()) < MIN_STEPS:
+        return None
+    return counts.most_common(1)[0][0]
+
+
+def default_row_ts():
+    parse = TimestampParser(TS_FORMATS)
+    return lambda ln: parse(ln.split(",", 1)[0])
+
+
+def infer_interval(path, make_row_ts=default_row_ts):
+    """
+    Return (interval, source) from a sample of path; interval is None if it
+    can't be told (source then says why).
+    """
+    header, head, tail = sample_lines(path)
+    table = split_fields(header[0])[-1] if header else None
+    named = interval_from_name(table)
+
+    row_ts = make_row_ts()
+    samples = [[ts for ts in map(row_ts, rows) if ts is not None] for rows in (head, tail)]
+    step = mode_step(*samples)
+
+    if step is None:
+        if named is not None:
+            return named, f"from table name {table!r}; too few rows to check"
+        return None, "too few rows to infer it"
+    if named is not None and named != step:
+        return None, f"rows step {step} but table name {table!r} says {named}"
+    if named is not None:
+        return step, f"inferred from rows, matches table name {table!r}"
+    return step, "inferred from rows"
+
+
+def table_interval(files, make_row_ts=default_row_ts):
+    """
+    (interval, source) for the table files belong to: FREQ_MAP if it lists
+    the table, else inferred from the first file that gives an answer.
+    Cached per (station, table).
+    """
+    entry = parse_name(files[0])
+    table = entry.table if entry else detect_suffix(os.path.basename(files[0]))
+    if table in FREQ_MAP:
+        return FREQ_MAP[table], "table type"
+
+    key = (entry.station.lower(), entry.table) if entry else os.path.abspath(files[0])
+    if key not in _cache:
+        result = None, "no files"
+        for path in files:
+            result = infer_interval(path, make_row_ts)
+            if result[0] is not None:
+                break
+        _cache[key] = result
+    return _cache[key]
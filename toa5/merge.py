@@ -0,0 +1,612 @@
+"""To perform a dry run, use this command:
+python -m toa5 merge --src "E:/MERGE/Nkeyema" --dst "E:/MERGE/MergedOutput" --dry-run
+
+replace the paths with your actual source and destination directories.
+(python merge_dat_simple.py ... still works the same way.)
+
+To merge every station folder under a root in parallel:
+python -m toa5 merge --src-root "E:/MERGE" --dst "E:/MERGE/MergedOutput" --jobs 8
+
+"""
+
+
+import io
+import os
+import time
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from toa5 import dat_io, metrics
+from toa5.catalog import Catalog, parse_name
+from toa5.checkpoint import MergeCheckpoint, guarded_append, undo_interrupted_append
+from toa5.compress import CODEC_NAMES, is_dat_name, with_codec
+from toa5.interval import table_interval
+from toa5.tables import HEADER_LINES, TS_FORMATS, parse_ts
+from toa5.ts_parser import TimestampParser
+
+
+def find_last_timestamp(path):
+    # read backwards from the end instead of loading the whole file
+    return dat_io.find_last_timestamp(path, parse_ts)
+
+
+def find_first_timestamp_after_header(path, header_lines=HEADER_LINES):
+    return dat_io.find_first_timestamp(path, parse_ts, header_lines)
+
+
+def data_row_check(parse):
+    # only split off the first field; the rest of the row is copied as-is
+    return lambda ln: parse(ln.split(",", 1)[0]) is not None
+
+
+def row_timestamp_reader(parse):
+    return lambda ln: parse(ln.split(",", 1)[0])
+
+
+def check_fields(src_file, src_fields, dst_fields, reconcile):
+    """Print how src's field list differs from the output's; False if the merge must stop."""
+    if src_fields == dst_fields:
+        return True
+
+    added, dropped = dat_io.field_differences(src_fields, dst_fields)
+    print(f"  ⚠ Field list of {os.path.basename(src_file)} differs from the output header")
+    if added:
+        print(f"    missing (written as NAN): {', '.join(added)}")
+    if dropped:
+        print(f"    not in the output (dropped): {', '.join(dropped)}")
+    if not added and not dropped:
+        print("    same fields in a different order")
+
+    if not reconcile:
+        print("  ❌ Columns would be misaligned → skipping (use --reconcile-fields)")
+        return False
+    print("  ↪ Reprojecting its rows into the output layout")
+    return True
+
+
+def merge_pair(a_file, b_file, dst, dry, overlap="skip", reconcile=False, fill_gaps=False, compress=None):
+    """
+    Merge A then B into dst if they are continuous. Returns a short status string.
+
+    If B starts before A ends and overlap is one of dat_io.OVERLAP_MODES,
+    the two files are interleaved by timestamp instead of being skipped.
+    If A's field list differs from B's, the pair is skipped unless reconcile
+    is set, in which case A's rows are rewritten into B's layout. With
+    fill_gaps, a gap between A and B (and any inside them) is filled with
+    NAN rows instead of failing the continuity check. The output is named
+    like B, compressed like B unless compress says otherwise (see output_path).
+    """
+    delta = table_delta([a_file, b_file])
+    if delta is None:
+        return "no-frequency"
+
+    with metrics.stage("boundary"):
+        last_A = find_last_timestamp(a_file)
+        first_B = find_first_timestamp_after_header(b_file)
+        fields_A = dat_io.read_field_names(a_file)
+        fields_B = dat_io.read_field_names(b_file)
+
+    if last_A is None:
+        print(f"  ❌ No timestamp found in A → {a_file}")
+        return "no-timestamp"
+
+    if first_B is None:
+        print(f"  ❌ No timestamp found in B → {b_file}")
+        return "no-timestamp"
+
+    with metrics.stage("continuity"):
+        expected = last_A + delta
+        overlapping = first_B < expected
+        continuous = first_B == expected
+
+    print(f"  Last A   = {last_A}")
+    print(f"  First B = {first_B}")
+    print(f"  Expected= {expected}")
+
+    if not check_fields(a_file, fields_A, fields_B, reconcile):
+        return "fields-differ"
+    reproject_a = dat_io.make_reprojector(fields_A, fields_B)
+
+    fill_delta = delta if fill_gaps else None
+
+    if overlapping and overlap != "skip":
+        print(f"  ⚠ Overlap — interleaving by timestamp ({overlap})")
+        return merge_overlapping(a_file, b_file, dst, dry, overlap, reproject_a, fill_delta, compress)
+
+    missing = dat_io.missing_intervals(last_A, first_B, delta)
+    if not continuous and not (fill_gaps and missing):
+        print("  ❌ Continuity check failed → skipping")
+        if missing:
+            print(f"   → Missing {missing} interval(s) (from {expected} to {first_B - delta})")
+        return "continuity-failed"
+
+    if fill_gaps:
+        # the interleave path has every row's timestamp, which the gap filler needs
+        if missing:
+            print(f"  ⚠ Missing {missing} interval(s) — filling with NAN rows")
+        else:
+            print("  ✅ Continuity OK — ready to merge, filling gaps inside the files")
+        return merge_overlapping(a_file, b_file, dst, dry, "prefer-b", reproject_a, fill_delta, compress)
+
+    print("  ✅ Continuity OK — ready to merge")
+
+    if dry:
+        print("  (dry-run) Not writing file.")
+        return "dry-run"
+
+    os.makedirs(dst, exist_ok=True)
+    out = output_path(dst, b_file, compress)
+
+    # header from B, then rows of A, then rows of B — streamed, never loaded whole
+    # one parser per file, so each learns its own timestamp layout
+    with metrics.stage("write") as m:
+        rows_a, rows_b = dat_io.stream_merge(
+            a_file, b_file, out,
+            data_row_check(metrics.timed(TimestampParser(TS_FORMATS), m)),
+            data_row_check(metrics.timed(TimestampParser(TS_FORMATS), m)),
+            reproject_a=reproject_a,
+            checkpoint=merge_checkpoint(out, [a_file, b_file], merge="append", reconcile=reproject_a is not None),
+        )
+        record_io(m, [a_file, b_file], out, rows_a + rows_b)
+
+    print(f"  ✅ Wrote merged → {out} ({rows_a} + {rows_b} rows)")
+    return "merged"
+
+
+def output_path(dst, source, compress=None):
+    """
+    dst/<source's file name>. compress ('gz', 'xz', 'bz2', '' for plain)
+    replaces the source's compression suffix; None keeps it.
+    """
+    name = os.path.basename(source)
+    if compress is not None:
+        name = with_codec(name, compress)
+    return os.path.join(dst, name)
+
+
+def merge_checkpoint(out, sources, **options):
+    """
+    MergeCheckpoint for writing out from sources (see checkpoint.py); says so
+    if it continues an interrupted run of the same merge.
+    """
+    checkpoint = MergeCheckpoint(out, sources, options, lambda: row_timestamp_reader(TimestampParser(TS_FORMATS)))
+    if checkpoint.resuming:
+        print(f"  ↪ Resuming an interrupted merge from its checkpoint at {checkpoint.last_ts}")
+    return checkpoint
+
+
+def table_delta(files):
+    """Recording interval of the table (FREQ_MAP, else inferred from the files); printed if inferred."""
+    with metrics.stage("interval"):
+        delta, source = table_interval(files)
+    if delta is None:
+        print(f"  ❌ Cannot detect frequency: {source}")
+    elif source != "table type":
+        print(f"  Interval = {delta} ({source})")
+    return delta
+
+
+def merge_overlapping(a_file, b_file, dst, dry, prefer, reproject_a=None, fill_delta=None, compress=None):
+    if dry:
+        print("  (dry-run) Not writing file.")
+        return "dry-run"
+
+    os.makedirs(dst, exist_ok=True)
+    out = output_path(dst, b_file, compress)
+    fill = gap_filler(fill_delta, b_file)
+
+    with metrics.stage("interleave") as m:
+        stats = dat_io.stream_interleave(
+            a_file, b_file, out,
+            row_timestamp_reader(metrics.timed(TimestampParser(TS_FORMATS), m)),
+            row_timestamp_reader(metrics.timed(TimestampParser(TS_FORMATS), m)),
+            prefer=prefer,
+            reproject_a=reproject_a,
+            fill=fill,
+            checkpoint=merge_checkpoint(out, [a_file, b_file], merge="interleave", prefer=prefer,
+                                        reconcile=reproject_a is not None, fill=str(fill_delta)),
+        )
+        record_io(m, [a_file, b_file], out, stats["from_a"] + stats["from_b"] + (fill.rows if fill else 0))
+
+    print(
+        f"  ✅ Wrote merged → {out} ({stats['from_a']} from A + {stats['from_b']} from B; "
+        f"{stats['overlap']} overlapping, {stats['replaced']} replaced)"
+    )
+    print_filled(fill)
+    return "merged"
+
+
+def gap_filler(delta, header_file):
+    """A GapFiller for output laid out like header_file, or None if delta is None."""
+    if delta is None:
+        return None
+    return dat_io.GapFiller(delta, len(dat_io.read_field_names(header_file)))
+
+
+def print_filled(fill):
+    if fill is not None:
+        print(f"  ↪ Filled {fill.gaps} gap(s) with {fill.rows} NAN row(s)")
+
+
+def merge_fragments(files, dst, dry, prefer, delta, reconcile=False, fill_gaps=False, compress=None):
+    """
+    Merge every fragment of one table into a single file with a k-way merge.
+
+    Used when a table has more than one ZMD or non-ZMD file (logger swaps,
+    repeated downloads). Duplicate timestamps are collapsed using prefer.
+    The output is named after the fragment that starts last, and takes its
+    header; fragments with other field lists are skipped unless reconcile.
+    With fill_gaps, missing intervals get NAN rows (this needs delta).
+    """
+    # named after the newest fragment, which is also the header stream_kway_merge
+    # writes and the field list checked against, so all three come from one file
+    with metrics.stage("boundary"):
+        newest = newest_fragment(files)
+        target = dat_io.read_field_names(newest)
+        fields = {f: dat_io.read_field_names(f) for f in files if f != newest}
+
+    if not all([check_fields(f, fields[f], target, reconcile) for f in fields]):
+        return "fields-differ"
+
+    if fill_gaps and delta is None:
+        print("  ❌ Gaps can't be filled without the table interval → skipping")
+        return "no-frequency"
+
+    if dry:
+        print("  (dry-run) Not writing file.")
+        return "dry-run"
+
+    os.makedirs(dst, exist_ok=True)
+    out = output_path(dst, newest, compress)
+    fill = gap_filler(delta if fill_gaps else None, newest)
+
+    with metrics.stage("kway-merge") as m:
+        stats = dat_io.stream_kway_merge(
+            files, out,
+            lambda: row_timestamp_reader(metrics.timed(TimestampParser(TS_FORMATS), m)),
+            prefer=prefer,
+            delta=delta,
+            reconcile=reconcile,
+            fill=fill,
+            header_path=newest,
+            checkpoint=merge_checkpoint(out, files, merge="kway", prefer=prefer, delta=str(delta),
+                                        reconcile=reconcile, fill=fill_gaps),
+        )
+        record_io(m, files, out, stats["rows"] + (fill.rows if fill else 0))
+
+    for path in stats["empty"]:
+        print(f"  ⚠ No data rows in {os.path.basename(path)}")
+    if not stats["rows"]:
+        print("  ❌ No data rows in any fragment → nothing to merge")
+        return "no-timestamp"
+    for path, n in stats["per_file"].items():
+        print(f"    {n:>8} rows from {os.path.basename(path)}")
+
+    print(
+        f"  ✅ Wrote merged → {out} ({stats['rows']} rows; {stats['duplicates']} duplicate(s) dropped, "
+        f"{stats['gaps']} gap(s), {stats['backwards']} backwards step(s))"
+    )
+    print_filled(fill)
+    return "merged"
+
+
+def newest_fragment(files):
+    return max(files, key=lambda f: find_first_timestamp_after_header(f) or datetime.min)
+
+
+def append_new_rows(source, out, delta, dry, other_ends=()):
+    """
+    Incremental refresh of an existing merged file.
+
+    The last timestamp of out is read from its tail, source is binary-searched
+    for the first newer row, and only the bytes from there on are appended,
+    after checking they continue on the table interval. other_ends are the
+    last timestamps of the table's other files; if any is newer than out,
+    those rows can only arrive with a full merge. The append is undone if it
+    fails, or on the next run if it was killed (see checkpoint.py). Returns
+    a status string, or None if out can't be extended and needs a full merge.
+    """
+    if not dry and undo_interrupted_append(out):
+        print(f"  ↪ Cut off the rows of an append to {out} that never finished")
+
+    with metrics.stage("boundary"):
+        same_header = dat_io.read_header_lines(out) == dat_io.read_header_lines(source)
+        last_out = find_last_timestamp(out) if same_header else None
+
+    if not same_header:
+        print("  ⚠ Merged file header differs from the source — doing a full merge")
+        return None
+
+    if last_out is None:
+        print("  ⚠ No timestamp found in the merged file — doing a full merge")
+        return None
+
+    if any(end is not None and end > last_out for end in other_ends):
+        print("  ⚠ More than one source file has rows newer than the merged file — doing a full merge")
+        return None
+
+    with metrics.stage("offset-search"):
+        offset, first_new = dat_io.find_offset_after(
+            source, last_out, row_timestamp_reader(TimestampParser(TS_FORMATS))
+        )
+
+    print(f"  Last merged = {last_out}")
+    if offset is None:
+        print("  ✅ Up to date — nothing to append")
+        return "up-to-date"
+
+    expected = last_out + delta
+    print(f"  First new   = {first_new}")
+    print(f"  Expected    = {expected}")
+
+    if first_new != expected:
+        print("  ❌ Continuity check failed → not appending")
+        return "continuity-failed"
+
+    if dry:
+        print("  (dry-run) Not appending.")
+        return "dry-run"
+
+    with metrics.stage("append") as m, guarded_append(out):
+        nbytes, nrows = dat_io.append_tail(source, offset, out)
+        m.update(rows=nrows, bytes_read=nbytes, bytes_written=nbytes)
+    print(f"  ✅ Appended {nrows} rows ({nbytes} bytes) → {out}")
+    return "appended"
+
+
+def record_io(m, sources, out, rows):
+    m["rows"] = rows
+    m["bytes_read"] = sum(metrics.file_size(f) for f in sources)
+    m["bytes_written"] = metrics.file_size(out)
+
+
+def find_table_groups(folder):
+    """
+    Return [(suffix, [files]), ...] for every station table with two or more files.
+
+    A group of exactly one ZMD and one Secondary file is an ordinary pair;
+    anything larger is a set of fragments for merge_fragments. File names
+    that don't parse (see catalog.py), and files with no other file of
+    their station and table, are reported and left out.
+    """
+    catalog = Catalog.from_folder(folder)
+    catalog.report_unknown()
+
+    groups = []
+    for suf, entries in catalog.table_groups():
+        if len(entries) >= 2:
+            groups.append((suf, [os.path.join(folder, e.name) for e in entries]))
+        else:
+            print(f"  ⚠ No other {entries[0].station} {suf} file to merge with, not merged: {entries[0].name}")
+    return groups
+
+
+def split_pair(files):
+    """Return (A, B) if files are one ZMD and one other-role (e.g. Secondary) file, else None."""
+    roles = [getattr(parse_name(f), "role", None) for f in files]
+    A = [f for f, role in zip(files, roles) if role == "ZMD"]
+    B = [f for f, role in zip(files, roles) if role != "ZMD"]
+    if len(A) == 1 and len(B) == 1:
+        return A[0], B[0]
+    return None
+
+
+def describe_group(files):
+    pair = split_pair(files)
+    if pair:
+        return "Checking pair:\n  A: " + pair[0] + "\n  B: " + pair[1]
+    return f"Merging {len(files)} fragments:\n" + "\n".join("  - " + f for f in files)
+
+
+def merge_group(suf, files, dst, dry, overlap, incremental=False, reconcile=False, fill_gaps=False,
+                compress=None):
+    """merge_table, recorded as one metrics unit. Returns the status string."""
+    station = os.path.basename(os.path.dirname(os.path.abspath(files[0])))
+    kind = "pair" if split_pair(files) else "fragments"
+    names = [os.path.basename(f) for f in files]
+
+    with metrics.unit(kind, station=station, table=suf, files=names) as u:
+        u["status"] = merge_table(suf, files, dst, dry, overlap, incremental, reconcile, fill_gaps, compress)
+    return u["status"]
+
+
+def merge_table(suf, files, dst, dry, overlap, incremental=False, reconcile=False, fill_gaps=False,
+                compress=None):
+    """
+    Merge one table: merge_pair for a ZMD/non-ZMD pair, merge_fragments otherwise.
+    With incremental, an existing output is only extended with the new rows
+    of the newest source file (not with fill_gaps: appended bytes aren't
+    checked for gaps, so the whole table is merged again).
+    """
+    pair = split_pair(files)
+
+    if incremental and fill_gaps:
+        print("  ⚠ --fill-gaps: merging the whole table, not appending")
+    elif incremental:
+        out = output_path(dst, pair[1] if pair else newest_fragment(files), compress)
+        if os.path.exists(out):
+            delta = table_delta(files)
+            if delta is None:
+                return "no-frequency"
+            # new rows come from whichever file ends last (a repeated download
+            # can start with an older one and run past it)
+            with metrics.stage("boundary"):
+                ends = {f: find_last_timestamp(f) for f in files}
+            source = max(files, key=lambda f: ends[f] or datetime.min)
+            others = [ends[f] for f in files if f != source]
+            status = append_new_rows(source, out, delta, dry, others)
+            if status is not None:
+                return status
+
+    if pair:
+        return merge_pair(pair[0], pair[1], dst, dry, overlap, reconcile, fill_gaps, compress)
+    # fragments always need their duplicates resolved; default to the later one
+    prefer = overlap if overlap != "skip" else "prefer-b"
+    # a gap count is only possible with an interval; the merge itself doesn't need one
+    delta = table_delta(files)
+    return merge_fragments(files, dst, dry, prefer, delta, reconcile, fill_gaps, compress)
+
+
+def find_station_folders(root):
+    """Return every direct subfolder of root that contains .dat files."""
+    folders = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and any(is_dat_name(f) for f in os.listdir(path)):
+            folders.append(path)
+    return folders
+
+
+def merge_job(job):
+    """Run one merge_group in a worker; its log lines and metrics are returned, not printed."""
+    station, suf, files, dst, dry, overlap, incremental, reconcile, fill_gaps, compress, timed_parse = job
+    # workers are reused across jobs: only send back this job's units
+    metrics.reset()
+    metrics.enable(timed_parse)
+    log = io.StringIO()
+    with redirect_stdout(log):
+        try:
+            status = merge_group(suf, files, dst, dry, overlap, incremental, reconcile, fill_gaps, compress)
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+            status = "error"
+    return station, files, status, log.getvalue(), metrics.collect()
+
+
+def run_batch(src_root, dst, dry, jobs=None, overlap="skip", incremental=False, reconcile=False,
+              fill_gaps=False, compress=None):
+    """
+    Merge the tables of every station folder under src_root across a process pool.
+
+    The biggest groups are submitted first so a single large 10-minute table
+    doesn't end up running alone at the end. Each station gets its own
+    subfolder in dst. Returns the per-table results.
+    """
+    work = []
+    for folder in find_station_folders(src_root):
+        station = os.path.basename(os.path.normpath(folder))
+        for suf, files in find_table_groups(folder):
+            size = sum(os.path.getsize(f) for f in files)
+            job = (station, suf, files, os.path.join(dst, station), dry, overlap, incremental, reconcile,
+                   fill_gaps, compress, metrics.enabled)
+            work.append((size, job))
+
+    work.sort(key=lambda w: w[0], reverse=True)
+    print(f"Found {len(work)} table(s) to check.")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(merge_job, job) for _, job in work]
+        for fut in as_completed(futures):
+            station, files, status, log, units = fut.result()
+            print(f"\n[{station}] {describe_group(files)}")
+            print(log, end="")
+            results.append((station, files, status))
+            metrics.extend(units)
+
+    print_summary(results)
+    return results
+
+
+def print_summary(results):
+    counts = {}
+    for _, _, status in results:
+        counts[status] = counts.get(status, 0) + 1
+
+    print("\n==== Summary ====")
+    for status, n in sorted(counts.items()):
+        print(f"  {status:<18} {n}")
+
+    for station, files, status in sorted(results):
+        if status not in ("merged", "appended", "up-to-date", "dry-run"):
+            print(f"  ❌ [{station}] {os.path.basename(files[-1])} → {status}")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Merge the ZMD and Secondary downloads of each table")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--src", help="One station folder")
+    src.add_argument("--src-root", help="Folder of station folders; merged in parallel")
+    parser.add_argument("--dst")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--overlap", choices=("skip",) + dat_io.OVERLAP_MODES, default="skip",
+                        help="What to do when B starts before A ends: skip the pair, or interleave "
+                             "by timestamp keeping A's, B's or the less-NAN row for shared timestamps. "
+                             "Also picks the row kept for duplicate timestamps across fragments "
+                             "(default there: the later fragment's)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="If the merged file already exists in --dst, only append the "
+                             "source rows newer than its last timestamp")
+    parser.add_argument("--reconcile-fields", action="store_true",
+                        help="If the files of a table have different field lists, rewrite the older rows "
+                             "into the output header's layout (NAN for missing fields) instead of skipping")
+    parser.add_argument("--fill-gaps", action="store_true",
+                        help="Write a row of NAN values for every missing interval (between A and B and "
+                             "inside the files) so the output is a regular series, instead of skipping "
+                             "pairs that aren't continuous")
+    parser.add_argument("--compress", choices=CODEC_NAMES + ("none",),
+                        help="Write the merged files gzip/xz/bz2-compressed (block-compressed, so later "
+                             "tail reads stay cheap), or 'none' for plain .dat; default: like the source")
+    parser.add_argument("--audit", action="store_true",
+                        help="Check every row of each file for gaps, duplicates and backwards jumps; no merging")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Worker processes for --src-root (default: all cores)")
+    parser.add_argument("--metrics", metavar="JSON",
+                        help="Write per-stage timings, rows, bytes and peak memory of every table to this file")
+    parser.add_argument("--profile", metavar="PROF",
+                        help="Write a cProfile dump of the run (with --src-root only the main process is profiled)")
+    args = parser.parse_args(argv)
+
+    if args.audit:
+        # numpy is only needed for the audit, so import it only here
+        from toa5.audit import audit_folder
+        folders = find_station_folders(args.src_root) if args.src_root else [args.src]
+        for folder in folders:
+            print(f"\n📂 Auditing: {folder}")
+            audit_folder(folder)
+        return
+
+    if not args.dst:
+        parser.error("--dst is required unless --audit is given")
+    if args.compress == "none":
+        args.compress = ""
+
+    # parse time is only split out when someone is going to look at it
+    metrics.enable(bool(args.metrics))
+    t0 = time.perf_counter()
+
+    with metrics.profiled(args.profile):
+        run(args)
+
+    if args.metrics:
+        metrics.write_report(args.metrics, "merge", argv, time.perf_counter() - t0)
+
+
+def run(args):
+    if args.src_root:
+        run_batch(args.src_root, args.dst, args.dry_run, args.jobs, args.overlap, args.incremental,
+                  args.reconcile_fields, args.fill_gaps, args.compress)
+        return
+
+    # for suf in FREQ_MAP:
+    #     A = [f for f in files if "ZMD" in f and suf in f]
+    #     B = [f for f in files if "Secondary" in f and suf in f]
+
+    #     if len(A) == 1 and len(B) == 1:
+    #         print("\nChecking pair:")
+    #         print("  A:", A[0])
+    #         print("  B:", B[0])
+    #         merge_pair(A[0], B[0], args.dst, args.dry_run)
+
+
+
+    for suf, files in find_table_groups(args.src):
+        print("\n" + describe_group(files))
+        merge_group(suf, files, args.dst, args.dry_run, args.overlap, args.incremental,
+                    args.reconcile_fields, args.fill_gaps, args.compress)
+
+
+if __name__ == "__main__":
+    main()
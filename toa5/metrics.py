@@ -0,0 +1,229 @@
+"""
+metrics.py
+
+Per-stage instrumentation for merge and scan runs.
+
+Work is recorded as units (one per table pair / fragment group, or per
+scanned file), each made of stages (boundary read, continuity check,
+streaming write, ...). A stage records its wall time, rows, bytes read and
+written, and its own peak RSS (Linux; elsewhere only the process's peak
+so far can be read, recorded as process_peak_rss_mb). With enable(), the
+timestamp parsing inside a streaming stage is timed separately as
+parse_seconds; that wrapper costs a little per row, so it is off by default.
+
+    with metrics.unit("pair", table="SYNOP", files=[a, b]) as u:
+        with metrics.stage("write") as m:
+            m["rows"] = ...
+        u["status"] = "merged"
+
+    metrics.write_report("metrics.json", "merge", argv, wall_seconds)
+
+Workers in a process pool collect() their units and the parent extend()s
+its own list with them.
+"""
+
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+enabled = False
+
+_units = []
+_current = None
+
+# highest VmHWM read just before reset_peak_rss() restarted it
+_hwm_before_reset = 0.0
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it can't be read."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1e6
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS; a reset_peak_rss() lowers it on Linux
+    return max(peak / 1e6 if sys.platform == "darwin" else peak / 1e3, _hwm_before_reset)
+
+
+def reset_peak_rss():
+    """Restart the kernel's RSS high-water mark (VmHWM); False where that isn't possible."""
+    global _hwm_before_reset
+    _hwm_before_reset = max(_hwm_before_reset, hwm_rss_mb() or 0.0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def hwm_rss_mb():
+    """Peak RSS in MB since the last reset_peak_rss(), or None where it can't be read."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for ln in f:
+                if ln.startswith("VmHWM:"):
+                    return int(ln.split()[1]) / 1e3
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def reset():
+    global _current
+    _units.clear()
+    _current = None
+
+
+def collect():
+    """This process's units so far (to send back from a worker)."""
+    return list(_units)
+
+
+def extend(units):
+    _units.extend(units)
+
+
+@contextmanager
+def unit(kind, **labels):
+    """Group the stages run inside the block; set u["status"] to record the outcome."""
+    global _current
+    u = {"kind": kind, **labels, "status": None, "stages": []}
+    _units.append(u)
+    prev, _current = _current, u
+    t0 = time.perf_counter()
+    try:
+        yield u
+    finally:
+        u["seconds"] = time.perf_counter() - t0
+        _current = prev
+
+
+@contextmanager
+def stage(name):
+    """Time one stage; the caller fills in rows / bytes_read / bytes_written."""
+    m = {"stage": name, "rows": 0, "bytes_read": 0, "bytes_written": 0}
+    own_peak = reset_peak_rss()
+    t0 = time.perf_counter()
+    try:
+        yield m
+    finally:
+        m["seconds"] = time.perf_counter() - t0
+        # ru_maxrss never goes down, so it's only the stage's own without the reset
+        peak = hwm_rss_mb() if own_peak else None
+        if peak is not None:
+            m["peak_rss_mb"] = peak
+        else:
+            m["process_peak_rss_mb"] = peak_rss_mb()
+        if _current is not None:
+            _current["stages"].append(m)
+        else:
+            _units.append({"kind": "run", "status": None, "stages": [m], "seconds": m["seconds"]})
+
+
+def timed(fn, m, key="parse_seconds"):
+    """fn, adding the time spent in it to m[key] — only when enabled."""
+    if not enabled:
+        return fn
+    m.setdefault(key, 0.0)
+    clock = time.perf_counter
+
+    def wrapper(*args):
+        t0 = clock()
+        try:
+            return fn(*args)
+        finally:
+            m[key] += clock() - t0
+
+    return wrapper
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def stage_totals(units):
+    totals = {}
+    for u in units:
+        for m in u["stages"]:
+            t = totals.setdefault(m["stage"], {
+                "count": 0, "seconds": 0.0, "rows": 0, "bytes_read": 0, "bytes_written": 0,
+            })
+            t["count"] += 1
+            for key in ("seconds", "rows", "bytes_read", "bytes_written", "parse_seconds"):
+                if key in m:
+                    t[key] = t.get(key, 0) + m[key]
+
+    for t in totals.values():
+        s = t["seconds"]
+        t["rows_per_s"] = t["rows"] / s if s else None
+        t["mb_per_s"] = (t["bytes_read"] + t["bytes_written"]) / 1e6 / s if s else None
+    return totals
+
+
+def print_totals(totals):
+    print("\n==== Stages ====")
+    print(f"  {'stage':<16} {'n':>4} {'seconds':>9} {'parse s':>9} {'rows':>12} {'MB in':>9} {'MB out':>9}")
+    for name, t in sorted(totals.items(), key=lambda kv: -kv[1]["seconds"]):
+        parse = f"{t['parse_seconds']:.3f}" if "parse_seconds" in t else "-"
+        print(
+            f"  {name:<16} {t['count']:>4} {t['seconds']:>9.3f} {parse:>9} {t['rows']:>12,} "
+            f"{t['bytes_read'] / 1e6:>9.1f} {t['bytes_written'] / 1e6:>9.1f}"
+        )
+
+
+def write_report(path, command, argv, wall_seconds):
+    """Write the JSON metrics report for this run and print the per-stage totals."""
+    totals = stage_totals(_units)
+    report = {
+        "command": command,
+        "args": list(sys.argv[1:] if argv is None else argv),
+        "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "wall_seconds": wall_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "parse_timed": enabled,
+        "stages": totals,
+        "units": _units,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+
+    print_totals(totals)
+    print(f"\n📊 Metrics → {path}")
+    return report
+
+
+@contextmanager
+def profiled(path):
+    """cProfile the block into path (no-op if path is None)."""
+    if not path:
+        yield
+        return
+
+    import cProfile
+
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        prof.dump_stats(path)
+        print(f"🧪 Profile → {path}  (python -m pstats {path})")
@@ -0,0 +1,306 @@
+"""
+reader.py
+
+Typed, vectorized reader for TOA5 .dat files.
+
+The four TOA5 header lines (environment, field names, units, processing)
+give the record layout: TIMESTAMP becomes datetime64[s], RECORD int64 and
+every other field float64 with NaN for "NAN" (or text when a field isn't
+numeric). The body is parsed in bulk by np.loadtxt rather than line by
+line, and only the requested columns are ever converted.
+
+Usage:
+  from toa5.reader import load_toa5, read_header
+  data = load_toa5(path, columns=["TIMESTAMP", "AirTC_Avg"])
+  data["TIMESTAMP"], data["AirTC_Avg"]
+  read_header(path).units
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from toa5.audit import looks_iso, parse_each
+from toa5.compress import open_dat
+from toa5.tables import HEADER_LINES
+
+# data rows used to decide which fields are numeric
+SAMPLE_ROWS = 50
+
+Toa5Header = namedtuple("Toa5Header", ["environment", "fields", "units", "processing"])
+
+# per-field types that the header fixes; everything else is numeric or text
+FIXED_TYPES = {
+    "TIMESTAMP": "datetime64[s]",
+    "RECORD": "int64",
+}
+
+
+def unquote(value):
+    return value.strip().strip('"')
+
+
+def parse_header(f):
+    """Read the four header lines from an open text file into a Toa5Header."""
+    return Toa5Header(*[[unquote(v) for v in f.readline().split(",")] for _ in range(HEADER_LINES)])
+
+
+def read_header(path):
+    with open_dat(path) as f:
+        return parse_header(f)
+
+
+def to_datetime64(values):
+    """datetime64[s] array from timestamp strings; NaT where they don't parse."""
+    values = np.char.strip(np.array(values, dtype=str), '"')
+    return iso_to_datetime64(values, looks_iso(values))
+
+
+def iso_to_datetime64(values, iso):
+    """
+    datetime64[s] array from unquoted timestamps (str or bytes): the ones
+    marked in iso in one bulk cast, the rest one at a time.
+    """
+    ts = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[s]")
+    try:
+        ts[iso] = values[iso].astype("datetime64[s]")
+    except ValueError:
+        iso[:] = False
+    rest = np.flatnonzero(~iso)
+    if len(rest):
+        ts[rest] = parse_each(values[rest].astype(str))
+    return ts
+
+
+def to_int64(values):
+    """int64 array; falls back to a float64 column if any value isn't an integer."""
+    arr = to_numeric(values)
+    if arr.dtype.kind == "f" and np.isfinite(arr).all() and (arr == np.round(arr)).all():
+        return arr.astype(np.int64)
+    return arr
+
+
+def to_numeric(values):
+    """float64 if every value is a number or NAN (quoted or not), else the text as objects."""
+    arr = np.array(values, dtype=str)
+    try:
+        return arr.astype(np.float64)
+    except ValueError:
+        pass
+    arr = np.char.strip(arr, '"')
+    try:
+        return arr.astype(np.float64)
+    except ValueError:
+        return arr.astype(object)
+
+
+CONVERTERS = {
+    "datetime64[s]": to_datetime64,
+    "int64": to_int64,
+}
+
+
+def convert(name, values):
+    return CONVERTERS.get(FIXED_TYPES.get(name), to_numeric)(values)
+
+
+def sniff_layout(f, fields, wanted, sample_rows=SAMPLE_ROWS):
+    """
+    Record dtype for the wanted fields, from the header plus the first
+    sample_rows data rows of f (positioned just after the header).
+    """
+    rows = []
+    for ln in f:
+        if ln.strip():
+            rows.append((ln.rstrip("\r\n").split(",") + ["NAN"] * len(fields))[:len(fields)])
+        if len(rows) == sample_rows:
+            break
+
+    layout = []
+    for name in wanted:
+        values = [r[fields.index(name)] for r in rows]
+        layout.append((name, convert(name, values).dtype if rows else FIXED_TYPES.get(name, "float64")))
+    return np.dtype(layout)
+
+
+def load_bulk(path, fields, dtype):
+    """The whole body in one np.loadtxt call; ValueError if any row doesn't fit dtype."""
+    return np.loadtxt(
+        path,
+        delimiter=",",
+        quotechar='"',
+        comments=None,
+        skiprows=HEADER_LINES,
+        usecols=[fields.index(name) for name in dtype.names],
+        dtype=dtype,
+        encoding="utf-8",
+        ndmin=1,
+    )
+
+
+def first_fields(body):
+    """
+    The first field of every non-empty line of a TOA5 body (bytes), found
+    without splitting the rows: returns (chars, keep), chars a (rows, width)
+    uint8 matrix with the quotes removed and keep the 0-based body line
+    index of each row. None if the fields aren't all as wide and as quoted
+    as the first row's; the rows must then be tokenized.
+    """
+    buf = np.frombuffer(body, dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord("\n"))
+    if len(buf) and buf[-1] != ord("\n"):
+        ends = np.append(ends, len(buf))
+    starts = np.concatenate(([0], ends[:-1] + 1))[:len(ends)]
+    keep = np.flatnonzero(ends > starts)
+    if not len(keep):
+        return None
+    starts, ends = starts[keep], ends[keep]
+
+    field = body[starts[0]:ends[0]].split(b",", 1)[0].rstrip(b"\r")
+    width = len(field)
+    if not width or (ends - starts < width).any():
+        return None
+
+    # each row's field must end exactly there: at a comma or the line end
+    after = starts + width
+    delim = buf[np.minimum(after, len(buf) - 1)]
+    if not ((after == ends) | (delim == ord(",")) | (delim == ord("\r"))).all():
+        return None
+    chars = buf[starts[:, None] + np.arange(width)]
+    if (chars == ord(",")).any():
+        return None
+
+    if field.startswith(b'"'):
+        if width < 3 or (chars[:, 0] != ord('"')).any() or (chars[:, -1] != ord('"')).any():
+            return None
+        chars = chars[:, 1:-1]
+    return np.ascontiguousarray(chars), keep
+
+
+def looks_iso_chars(chars):
+    """looks_iso for timestamps of one width, as a (rows, width) uint8 matrix."""
+    n = chars.shape[1]
+    if n not in (16, 19):
+        return np.zeros(len(chars), dtype=bool)
+    iso = (chars[:, 4] == ord("-")) & (chars[:, 7] == ord("-")) & (chars[:, 10] == ord(" ")) & (chars[:, 13] == ord(":"))
+    return iso & (chars[:, 16] == ord(":")) if n == 19 else iso
+
+
+def load_timestamps(path):
+    """
+    Just the TIMESTAMP column, sliced out of the raw rows by first_fields()
+    and cast in bulk, so no row is tokenized. Returns (data, keep) like
+    load_split, or None if the rows must be tokenized after all.
+    """
+    with open_dat(path, "rb") as f:
+        for _ in range(HEADER_LINES):
+            f.readline()
+        body = f.read()
+
+    found = first_fields(body)
+    if found is None:
+        return None
+    chars, keep = found
+    values = chars.view(f"S{chars.shape[1]}").ravel()
+
+    data = np.empty(len(keep), dtype=[("TIMESTAMP", "datetime64[s]")])
+    data["TIMESTAMP"] = iso_to_datetime64(values, looks_iso_chars(chars))
+    return data, keep
+
+
+def split_body(body, width):
+    """
+    Split a TOA5 body into a flat field list, width fields per row.
+
+    Returns (flat, keep) where keep holds the 0-based body line index of
+    every non-empty row. Rows with the wrong number of fields are padded
+    with NAN / truncated.
+    """
+    lines = body.replace("\r", "").split("\n")
+    keep = [i for i, ln in enumerate(lines) if ln]
+    rows = [lines[i] for i in keep]
+
+    sep = width - 1
+    for i in [i for i, ln in enumerate(rows) if ln.count(",") != sep]:
+        rows[i] = ",".join((rows[i].split(",") + ["NAN"] * width)[:width])
+
+    flat = ",".join(rows).split(",") if rows else []
+    return flat, keep
+
+
+def load_split(body, fields, wanted):
+    """Slower, forgiving path: split every field, convert column by column (NaT/NaN/text for bad values)."""
+    width = len(fields)
+    flat, keep = split_body(body, width)
+
+    cols = [(name, convert(name, flat[fields.index(name)::width])) for name in wanted]
+    data = np.empty(len(keep), dtype=[(name, arr.dtype) for name, arr in cols])
+    for name, arr in cols:
+        data[name] = arr
+    return data, keep
+
+
+def body_line_numbers(path, rows):
+    """1-based file line of each of the rows data rows of path."""
+    with open_dat(path, "rb") as f:
+        lines = f.read().split(b"\n")[HEADER_LINES:]
+    if lines and not lines[-1].strip():
+        lines.pop()
+    if len(lines) == rows:
+        return np.arange(rows, dtype=np.int64) + HEADER_LINES + 1
+    keep = [i for i, ln in enumerate(lines) if ln.strip()]
+    return np.array(keep, dtype=np.int64) + HEADER_LINES + 1
+
+
+def parse_file(path, columns=None, with_lines=False):
+    """
+    Parse path; returns (header, data, line_numbers).
+
+    data is a structured array of the fields in columns (default: all);
+    the others are never converted. TIMESTAMP alone is sliced from the rows
+    without tokenizing them (load_timestamps). Otherwise the body goes
+    through np.loadtxt with the layout sniffed from the first rows; if
+    some later row doesn't fit (a text value in a numeric field, a non-ISO
+    timestamp, a short row) the file is parsed again with the forgiving
+    split path. line_numbers
+    (the 1-based file line of each row) is only computed with with_lines.
+    """
+    with open_dat(path) as f:
+        header = parse_header(f)
+        fields = header.fields
+        wanted = fields if columns is None else list(columns)
+        for name in wanted:
+            if name not in fields:
+                raise KeyError(f"{name} is not a field of {path}")
+        dtype = sniff_layout(f, fields, wanted)
+
+    if wanted == ["TIMESTAMP"] and fields[0] == "TIMESTAMP":
+        sliced = load_timestamps(path)
+        if sliced is not None:
+            data, keep = sliced
+            return header, data, keep + HEADER_LINES + 1 if with_lines else None
+
+    try:
+        data = load_bulk(path, fields, dtype)
+        line_numbers = body_line_numbers(path, len(data)) if with_lines else None
+    except ValueError:
+        with open_dat(path) as f:
+            parse_header(f)
+            body = f.read()
+        data, keep = load_split(body, fields, wanted)
+        line_numbers = np.array(keep, dtype=np.int64) + HEADER_LINES + 1 if with_lines else None
+
+    return header, data, line_numbers
+
+
+def load_toa5(path, columns=None):
+    """
+    Load a TOA5 .dat file into a NumPy structured array.
+
+    columns restricts (and orders) the fields; unneeded fields are never
+    converted. TIMESTAMP is datetime64[s], RECORD int64, numeric fields
+    float64 (NaN for "NAN") and text fields Python str objects. Field
+    names come from header line 2; use read_header(path) for the units
+    and processing lines.
+    """
+    return parse_file(path, columns)[1]
@@ -0,0 +1,187 @@
+"""
+scan.py
+
+Start and end date of every .dat file in a station folder, written to one
+sheet per station of station_date_summary.xlsx.
+
+Usage:
+  python -m toa5 scan                                   # pick the folder in a dialog
+  python -m toa5 scan --src "E:/MERGE/Nkeyema" --overwrite
+  python -m toa5 scan --src "E:/MERGE/Nkeyema" --no-excel
+"""
+
+import os
+import time
+import argparse
+
+from toa5 import gui, metrics
+from toa5.catalog import Catalog, parse_name
+from toa5.compress import is_dat_name
+from toa5.scan_cache import ScanCache
+
+# ---------------- CONFIG ----------------
+
+MASTER_XLSX = "station_date_summary.xlsx"
+
+# ---------------- HELPERS ----------------
+
+def detect_table_type(name, catalog=None):
+    # a catalog built for the whole folder has every name parsed already
+    entry = catalog.by_name.get(name) if catalog is not None else parse_name(name)
+    return entry.table if entry else "Unknown"
+
+
+def scan_folder(folder, files):
+    """Print and return [(file name, table type, start, end)] for files in folder."""
+    rows = []
+    catalog = Catalog(sorted(files))
+
+    # only new or changed files are read; grown files resume where they left off
+    cache = ScanCache(folder)
+
+    for fname in sorted(files):
+        path = os.path.join(folder, fname)
+        table_type = detect_table_type(fname, catalog)
+
+        with metrics.unit("file", file=fname, table=table_type) as u:
+            with metrics.stage("scan") as m:
+                read_before = cache.bytes_read
+                scan = cache.scan(path)
+                m["rows"] = scan.rows
+                m["bytes_read"] = cache.bytes_read - read_before
+            u["status"] = "cached" if m["bytes_read"] == 0 else "scanned"
+        start, end = scan.first, scan.last
+
+        print(f"{table_type}")
+        print(f"  File : {fname}")
+
+        if start and end:
+            print(f"  Start: {start}")
+            print(f"  End  : {end}")
+            print(f"  Rows : {scan.rows}")
+        else:
+            print("  ❌ Could not detect timestamps")
+
+        print()
+        rows.append((fname, table_type, start, end))
+
+    cache.close()
+    print(
+        f"Scan cache: {cache.hits} unchanged, {cache.resumed} grown, "
+        f"{cache.rescanned} (re)scanned"
+    )
+    catalog.report_unknown()
+    return rows
+
+
+def open_workbook(path):
+    # openpyxl is only needed when a workbook is actually written
+    from openpyxl import Workbook, load_workbook
+
+    if os.path.exists(path):
+        return load_workbook(path)
+    wb = Workbook()
+    wb.remove(wb.active)  # remove default sheet
+    return wb
+
+# ---------------- MAIN ----------------
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Start/end date of every .dat file in a station folder")
+    parser.add_argument("--src", help="Station folder (default: choose it in a dialog)")
+    parser.add_argument("--xlsx", default=MASTER_XLSX, help=f"Summary workbook (default {MASTER_XLSX})")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Replace the station's sheet if it exists (the dialog version asks)")
+    parser.add_argument("--no-excel", action="store_true", help="Only print the dates")
+    parser.add_argument("--metrics", metavar="JSON",
+                        help="Write per-file scan timings, rows, bytes and peak memory to this file")
+    parser.add_argument("--profile", metavar="PROF", help="Write a cProfile dump of the run")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    with metrics.profiled(args.profile):
+        run(args)
+
+    if args.metrics:
+        metrics.write_report(args.metrics, "scan", argv, time.perf_counter() - t0)
+
+
+def run(args):
+    # no --src: the original dialog-driven workflow
+    use_gui = args.src is None
+    folder = gui.ask_directory("Select Station Folder (contains .dat files)") if use_gui else args.src
+
+    if not folder:
+        return
+
+    files = [f for f in os.listdir(folder) if is_dat_name(f)]
+
+    if not files:
+        if use_gui:
+            gui.show_error("Error", "No .dat files found in selected folder.")
+        print("❌ No .dat files found in selected folder.")
+        return
+
+    station = os.path.basename(os.path.normpath(folder))
+
+    if args.no_excel:
+        print(f"\n📂 Scanning station: {station}\n")
+        scan_folder(folder, files)
+        return
+
+    # Load or create master workbook
+    wb = open_workbook(args.xlsx)
+
+    # If station sheet exists → confirm overwrite
+    if station in wb.sheetnames:
+        if use_gui:
+            overwrite = gui.ask_yes_no(
+                "Sheet Exists",
+                f"A sheet for '{station}' already exists.\n\nOverwrite it?"
+            )
+        else:
+            overwrite = args.overwrite
+        if not overwrite:
+            if use_gui:
+                gui.show_info("Cancelled", "Operation cancelled.")
+            else:
+                print(f"⚠️ Sheet '{station}' already exists in {args.xlsx} — use --overwrite to replace it")
+            return
+        del wb[station]
+
+    ws = wb.create_sheet(title=station)
+
+    # Header row
+    ws.append([
+        "Station",
+        "File Name",
+        "Table Type",
+        "Start Date",
+        "End Date",
+    ])
+
+    print(f"\n📂 Scanning station: {station}\n")
+
+    for fname, table_type, start, end in scan_folder(folder, files):
+        ws.append([
+            station,
+            fname,
+            table_type,
+            start,
+            end,
+        ])
+
+    with metrics.stage("write-xlsx"):
+        wb.save(args.xlsx)
+
+    if use_gui:
+        gui.show_info(
+            "Done",
+            f"Station '{station}' added to:\n{args.xlsx}"
+        )
+
+    print(f"✅ Updated Excel → {args.xlsx}")
+
+
+if __name__ == "__main__":
+    main()
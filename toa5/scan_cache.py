@@ -0,0 +1,190 @@
+"""
+scan_cache.py
+
+Persistent, incremental scan results for a station folder.
+
+A SQLite sidecar (.dat_scan_cache.sqlite) in the station folder remembers,
+for every .dat file, its first and last timestamp, data row count and
+header signature, keyed by path, size, mtime and inode. Unchanged files are
+answered from the cache without being opened; files that only grew (same
+inode and header, larger size) are scanned from the byte offset where the
+previous scan stopped; anything else is scanned again from the top.
+Compressed files work the same way, with offsets into their uncompressed
+data (resuming one still decompresses up to the offset).
+
+Usage:
+    with ScanCache(folder) as cache:
+        scan = cache.scan(path)
+        print(scan.first, scan.last, scan.rows)
+"""
+
+import os
+import hashlib
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+
+from toa5.compress import is_compressed, open_dat
+from toa5.tables import HEADER_LINES, TS_FORMATS
+from toa5.ts_parser import TimestampParser
+
+CACHE_NAME = ".dat_scan_cache.sqlite"
+
+FileScan = namedtuple("FileScan", ["first", "last", "rows", "header_sig"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path       TEXT PRIMARY KEY,
+    size       INTEGER NOT NULL,
+    mtime_ns   INTEGER NOT NULL,
+    inode      INTEGER NOT NULL,
+    header_sig TEXT,
+    first_ts   TEXT,
+    last_ts    TEXT,
+    rows       INTEGER NOT NULL,
+    offset     INTEGER NOT NULL,
+    tail_ts    TEXT
+)
+"""
+
+
+def to_text(ts):
+    return ts.isoformat(sep=" ") if ts else None
+
+
+def from_text(text):
+    return datetime.fromisoformat(text) if text else None
+
+
+def read_header(f, header_lines=HEADER_LINES):
+    """Read the header lines of a file opened in binary mode; return (signature, offset)."""
+    h = hashlib.sha1()
+    for _ in range(header_lines):
+        h.update(f.readline())
+    return h.hexdigest(), f.tell()
+
+
+def scan_rows(f, parse, first, last, rows):
+    """
+    Scan data rows from the current position of a binary file to EOF.
+
+    Only newline-terminated lines advance the returned offset, so a row the
+    logger is still writing is re-read next time. Such a trailing line is
+    returned separately as tail_ts if it parses.
+    Returns (first, last, rows, offset, tail_ts).
+    """
+    offset = f.tell()
+    tail_ts = None
+
+    for ln in f:
+        if not ln.endswith(b"\n"):
+            tail_ts = parse(ln.split(b",", 1)[0].decode("utf-8", errors="ignore"))
+            break
+
+        offset += len(ln)
+        ts = parse(ln.split(b",", 1)[0].decode("utf-8", errors="ignore"))
+        if ts is None:
+            continue
+        if first is None:
+            first = ts
+        last = ts
+        rows += 1
+
+    return first, last, rows, offset, tail_ts
+
+
+class ScanCache:
+    """SQLite-backed cache of per-file scan results for one station folder."""
+
+    def __init__(self, folder, db_path=None, formats=TS_FORMATS):
+        self.formats = formats
+        self.hits = 0
+        self.resumed = 0
+        self.rescanned = 0
+        self.bytes_read = 0
+
+        db_path = db_path or os.path.join(folder, CACHE_NAME)
+        try:
+            self.db = sqlite3.connect(db_path)
+            self.db.execute(SCHEMA)
+        except sqlite3.Error:
+            # read-only share etc. — still works, just without persistence
+            self.db = sqlite3.connect(":memory:")
+            self.db.execute(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def scan(self, path):
+        """Return FileScan(first, last, rows, header_sig) for path, re-reading only what changed."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+
+        row = self.db.execute(
+            "SELECT size, mtime_ns, inode, header_sig, first_ts, last_ts, rows, offset, tail_ts "
+            "FROM files WHERE path = ?",
+            (path,),
+        ).fetchone()
+
+        if row and row[:3] == (st.st_size, st.st_mtime_ns, st.st_ino):
+            self.hits += 1
+            return self.result(row[3], row[4], row[5], row[6], row[8])
+
+        parse = TimestampParser(self.formats)
+
+        with open_dat(path, "rb") as f:
+            header_sig, body_start = read_header(f)
+
+            first = last = None
+            rows = 0
+            start = body_start
+
+            # grown file: same inode and header, and the old scan ended on a line break
+            if (
+                row
+                and row[2] == st.st_ino
+                and row[3] == header_sig
+                and st.st_size > row[0]
+                and row[7] >= body_start
+                and self.ends_line(f, row[7])
+            ):
+                first, last, rows, start = from_text(row[4]), from_text(row[5]), row[6], row[7]
+                self.resumed += 1
+            else:
+                self.rescanned += 1
+
+            f.seek(start)
+            first, last, rows, offset, tail_ts = scan_rows(f, parse, first, last, rows)
+            # a compressed file is decompressed from the top either way
+            self.bytes_read += st.st_size if is_compressed(path) else st.st_size - start
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, st.st_ino, header_sig,
+             to_text(first), to_text(last), rows, offset, to_text(tail_ts)),
+        )
+        self.db.commit()
+
+        return self.result(header_sig, to_text(first), to_text(last), rows, to_text(tail_ts))
+
+    @staticmethod
+    def ends_line(f, offset):
+        if offset == 0:
+            return True
+        f.seek(offset - 1)
+        return f.read(1) == b"\n"
+
+    @staticmethod
+    def result(header_sig, first, last, rows, tail):
+        # a trailing unterminated row counts, but isn't part of the resume state
+        first, last, tail = from_text(first), from_text(last), from_text(tail)
+        if tail:
+            return FileScan(first or tail, tail, rows + 1, header_sig)
+        return FileScan(first, last, rows, header_sig)
@@ -0,0 +1,45 @@
+"""
+tables.py
+
+What every tool needs to know about the logger tables: header size,
+timestamp formats and the recording interval of each table type.
+"""
+
+from datetime import datetime, timedelta
+
+HEADER_LINES = 4
+
+TS_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+]
+
+# table type (as it appears in the filename) -> recording interval
+FREQ_MAP = {
+    "TableDay": timedelta(days=1),
+    "TableETHour": timedelta(hours=1),
+    "TableHour": timedelta(hours=1),
+    "SYNOP": timedelta(hours=1),
+    "Table10m": timedelta(minutes=10),
+    "TableSolarCharger10m": timedelta(minutes=10),
+}
+
+TABLE_TYPES = list(FREQ_MAP)
+
+
+def detect_suffix(name):
+    """Table type contained in a filename, or None."""
+    for k in FREQ_MAP:
+        if k in name:
+            return k
+    return None
+
+
+def parse_ts(text):
+    text = text.strip().strip('"')
+    for fmt in TS_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,124 @@
+"""
+ts_parser.py
+
+Fast timestamp parsing for .dat rows.
+
+datetime.strptime is slow, and trying every entry of a TS_FORMATS list on
+every row (with an exception per miss) is the main CPU cost of a merge.
+TimestampParser learns the layout of a file from its first row, e.g.
+"YYYY-MM-DD HH:MM:SS", and from then on decodes rows by slicing the string
+and converting the pieces with int(). Rows that don't fit the learned
+layout fall back to the strptime path.
+"""
+
+from datetime import datetime
+from operator import itemgetter
+
+# Width of every fixed-width strptime directive we know how to slice
+FIELD_WIDTHS = {
+    "%Y": 4,
+    "%m": 2,
+    "%d": 2,
+    "%H": 2,
+    "%M": 2,
+    "%S": 2,
+}
+
+# Order of the datetime() constructor arguments
+FIELD_ORDER = ("%Y", "%m", "%d", "%H", "%M", "%S")
+
+
+def fixed_layout(fmt):
+    """
+    Return (length, [slice, ...], {pos: char}) for a format whose directives
+    are all fixed-width: the slices are in datetime() argument order and the
+    dict holds the literal separators. Returns None if the format can't be
+    decoded by slicing.
+    """
+    spans = {}
+    seps = {}
+    pos = 0
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == "%":
+            d = fmt[i:i + 2]
+            if d not in FIELD_WIDTHS or d in spans:
+                return None
+            spans[d] = slice(pos, pos + FIELD_WIDTHS[d])
+            pos += FIELD_WIDTHS[d]
+            i += 2
+        else:
+            seps[pos] = fmt[i]
+            pos += 1
+            i += 1
+
+    # year, month and day are required; time fields must be a prefix of H, M, S
+    slices = []
+    for d in FIELD_ORDER:
+        if d not in spans:
+            break
+        slices.append(spans[d])
+    if len(slices) < 3 or len(slices) != len(spans):
+        return None
+
+    return pos, slices, seps
+
+
+class TimestampParser:
+    """
+    Parse timestamps with one of `formats`, learning the layout once.
+
+    Use one parser per file: the first timestamp that parses fixes the
+    format, and the first zero-padded one fixes the slicing layout. Every
+    later row with the same length and separators is decoded by slicing;
+    anything else goes through strptime, trying the learned format first.
+    Calling the parser returns a datetime or None.
+    """
+
+    def __init__(self, formats):
+        self.formats = list(formats)
+        self.format = None
+        self.length = None
+        self.getter = None
+        self.sep_getter = None
+        self.seps = None
+
+    def learn(self, fmt, sample):
+        """Fix the layout from a sample string that parsed with fmt."""
+        self.format = fmt
+        # try the learned format first on the slow path
+        self.formats.remove(fmt)
+        self.formats.insert(0, fmt)
+
+        layout = fixed_layout(fmt)
+        if layout is None or len(sample) != layout[0]:
+            return
+
+        self.length, slices, seps = layout
+        self.getter = itemgetter(*slices)
+        if seps:
+            self.sep_getter = itemgetter(*seps)
+            self.seps = self.sep_getter(sample)
+
+    def parse_slow(self, text):
+        for fmt in self.formats:
+            try:
+                ts = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            # until a row fits the fixed layout, keep trying to learn it
+            if self.getter is None and self.format in (None, fmt):
+                self.learn(fmt, text)
+            return ts
+        return None
+
+    def __call__(self, text):
+        text = text.strip().strip('"')
+        if len(text) == self.length and (
+            self.sep_getter is None or self.sep_getter(text) == self.seps
+        ):
+            try:
+                return datetime(*map(int, self.getter(text)))
+            except ValueError:
+                pass
+        return self.parse_slow(text)
@@ -0,0 +1,340 @@
+"""
+watch.py
+
+Long-running watch mode: keeps the merged output of every station folder
+current as new data lands, instead of re-running merge on a schedule.
+
+The station folders are watched with inotify on Linux (through ctypes, no
+extra package); elsewhere, or with --poll-only, the .dat files are polled
+every --poll seconds for a changed size or mtime. A file is queued once it
+has been quiet for --settle seconds, since loggers and downloads write in
+bursts. Each queued table is merged incrementally (merge.merge_group with
+incremental=True) by a small process pool, and the station's scan cache is
+refreshed for its files. Between arrivals the process is blocked in
+select() (or sleeping between polls), so it uses no CPU.
+
+Usage:
+  python -m toa5 watch --src-root "E:/MERGE" --dst "E:/MERGE/MergedOutput"
+  python -m toa5 watch --src "E:/MERGE/Nkeyema" --dst "E:/MERGE/MergedOutput" --poll-only
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from toa5 import dat_io
+from toa5.catalog import Catalog, parse_name
+from toa5.compress import CODEC_NAMES, is_dat_name
+from toa5.merge import merge_job
+from toa5.scan_cache import ScanCache
+
+# ---------------- CONFIG ----------------
+
+SETTLE_SECONDS = 2.0
+POLL_SECONDS = 5.0
+JOBS = 2
+
+# how often finished merges are collected while any are running
+BUSY_POLL = 0.5
+
+# statuses that only get a one-line report
+QUIET_STATUSES = ("appended", "up-to-date", "merged", "single-file")
+
+# inotify event bits (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+FILE_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+ROOT_MASK = IN_CREATE | IN_MOVED_TO
+
+# ---------------- WATCHERS ----------------
+
+class Inotify:
+    """Just enough of inotify(7) through ctypes: add watches, wait for events."""
+
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folders = {}  # watch descriptor -> folder
+
+    def add(self, folder, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), mask)
+        if wd < 0:
+            raise OSError(self._ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+        self.folders[wd] = folder
+
+    def wait(self, timeout):
+        """[(folder, mask, name)] of the events within timeout seconds (None: wait for one)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        pos = 0
+        while pos + self.EVENT.size <= len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, pos)
+            pos += self.EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0").decode("utf-8", errors="ignore")
+            pos += length
+            events.append((self.folders.get(wd), mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def dat_files(folder):
+    try:
+        return [e.path for e in os.scandir(folder) if is_dat_name(e.name) and e.is_file()]
+    except OSError:
+        return []
+
+
+class InotifyWatcher:
+    """Changed .dat paths from inotify; new station folders under root are picked up too."""
+
+    name = "inotify"
+
+    def __init__(self, root, list_folders):
+        self.root = root
+        self.list_folders = list_folders
+        self.inotify = Inotify()
+        if root:
+            self.inotify.add(root, ROOT_MASK)
+        for folder in list_folders():
+            self.inotify.add(folder, FILE_MASK)
+
+    def changes(self, timeout):
+        changed = []
+        for folder, mask, name in self.inotify.wait(timeout):
+            if mask & IN_Q_OVERFLOW:
+                # events were lost: treat every file as changed
+                return [p for f in self.list_folders() for p in dat_files(f)]
+            path = os.path.join(folder, name)
+            if folder == self.root:
+                if mask & IN_ISDIR and path in self.list_folders():
+                    self.inotify.add(path, FILE_MASK)
+                    # files may have landed before the watch was in place
+                    changed.extend(dat_files(path))
+            elif is_dat_name(name):
+                changed.append(path)
+        return changed
+
+    def close(self):
+        self.inotify.close()
+
+
+class PollWatcher:
+    """Changed .dat paths found by comparing (size, mtime) every interval seconds."""
+
+    name = "polling"
+
+    def __init__(self, list_folders, interval):
+        self.list_folders = list_folders
+        self.interval = interval
+        self.seen = self.snapshot()
+
+    def snapshot(self):
+        snap = {}
+        for folder in self.list_folders():
+            for path in dat_files(folder):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snap[path] = (st.st_size, st.st_mtime_ns)
+        return snap
+
+    def changes(self, timeout):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snap = self.snapshot()
+        changed = [p for p, sig in snap.items() if self.seen.get(p) != sig]
+        self.seen = snap
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root, list_folders, poll, poll_only=False):
+    if not poll_only and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, list_folders)
+        except OSError as e:
+            print(f"⚠ inotify unavailable ({e}) — polling every {poll:g} s")
+    return PollWatcher(list_folders, poll)
+
+# ---------------- JOBS ----------------
+
+def table_files(folder, station, table):
+    for suf, entries in Catalog.from_folder(folder).table_groups():
+        if suf == table and entries[0].station.lower() == station:
+            return [os.path.join(folder, e.name) for e in entries]
+    return []
+
+
+def watch_job(folder, station, table, dst, overlap, reconcile, fill_gaps, compress=None):
+    """Incremental merge of one table (if it has two or more files), then refresh the scan cache."""
+    files = table_files(folder, station, table)
+    if len(files) >= 2:
+        job = (station, table, files, dst, False, overlap, True, reconcile, fill_gaps, compress, False)
+        _, _, status, log, _ = merge_job(job)
+    else:
+        status, log = "single-file", ""
+
+    with ScanCache(folder) as cache:
+        for path in files:
+            cache.scan(path)
+    return status, log
+
+# ---------------- MAIN ----------------
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Watch station folders and merge new data as it lands")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--src", help="One station folder")
+    src.add_argument("--src-root", help="Folder of station folders (new ones are picked up)")
+    parser.add_argument("--dst", required=True)
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                        help=f"Seconds a file must be quiet before it is merged (default {SETTLE_SECONDS:g})")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS,
+                        help=f"Polling interval when inotify isn't used (default {POLL_SECONDS:g})")
+    parser.add_argument("--poll-only", action="store_true", help="Poll even where inotify is available")
+    parser.add_argument("--jobs", type=int, default=JOBS, help=f"Merge worker processes (default {JOBS})")
+    parser.add_argument("--overlap", choices=("skip",) + dat_io.OVERLAP_MODES, default="skip",
+                        help="As for merge")
+    parser.add_argument("--reconcile-fields", action="store_true", help="As for merge")
+    parser.add_argument("--fill-gaps", action="store_true",
+                        help="As for merge (each change then re-merges the whole table)")
+    parser.add_argument("--compress", choices=CODEC_NAMES + ("none",), help="As for merge")
+    args = parser.parse_args(argv)
+    if args.compress == "none":
+        args.compress = ""
+
+    dst = os.path.abspath(args.dst)
+
+    def list_folders():
+        if args.src:
+            return [os.path.abspath(args.src)]
+        root = os.path.abspath(args.src_root)
+        folders = []
+        for name in sorted(os.listdir(root)):
+            path = os.path.join(root, name)
+            # the output folder may live under the root; never watch it
+            if os.path.isdir(path) and not (path + os.sep).startswith(dst + os.sep):
+                folders.append(path)
+        return folders
+
+    def out_dir(folder):
+        return dst if args.src else os.path.join(dst, os.path.basename(folder))
+
+    watcher = make_watcher(args.src_root and os.path.abspath(args.src_root), list_folders,
+                           args.poll, args.poll_only)
+    print(f"👀 Watching {len(list_folders())} station folder(s) ({watcher.name}); merged → {dst}")
+    print("   Ctrl+C to stop\n")
+
+    pending = {}     # path -> time of its last change
+    running = {}     # (folder, station, table) -> future
+    again = set()    # tables that changed again while being merged
+    unknown = set()
+
+    # catch up once at start: every existing file counts as changed
+    start = time.monotonic() - args.settle
+    for folder in list_folders():
+        for path in dat_files(folder):
+            pending[path] = start
+
+    pool = ProcessPoolExecutor(max_workers=args.jobs)
+    try:
+        while True:
+            now = time.monotonic()
+
+            # queue the tables of files that have settled (once per table)
+            ready = set()
+            for path, changed in list(pending.items()):
+                if now - changed < args.settle:
+                    continue
+                del pending[path]
+                entry = parse_name(path)
+                if entry is None:
+                    if path not in unknown:
+                        unknown.add(path)
+                        print(f"⚠ Unrecognised file name, not merged: {path}")
+                    continue
+                ready.add((os.path.dirname(path), entry.station.lower(), entry.table))
+
+            for key in sorted(ready):
+                if key in running:
+                    again.add(key)
+                else:
+                    running[key] = submit(pool, key, out_dir(key[0]), args)
+
+            # report finished merges; re-run those that changed meanwhile
+            for key, fut in list(running.items()):
+                if not fut.done():
+                    continue
+                del running[key]
+                report(key, fut)
+                if key in again:
+                    again.discard(key)
+                    running[key] = submit(pool, key, out_dir(key[0]), args)
+
+            # sleep until the next file settles, a merge may have finished, or something changes
+            timeout = None
+            if pending:
+                timeout = max(0.0, min(pending.values()) + args.settle - time.monotonic())
+            if running:
+                timeout = BUSY_POLL if timeout is None else min(timeout, BUSY_POLL)
+
+            changed = watcher.changes(timeout)
+            now = time.monotonic()
+            for path in changed:
+                pending[path] = now
+    except KeyboardInterrupt:
+        print("\n⏹ Stopping — waiting for running merges")
+    finally:
+        pool.shutdown(wait=True)
+        watcher.close()
+
+
+def submit(pool, key, dst, args):
+    folder, station, table = key
+    return pool.submit(watch_job, folder, station, table, dst,
+                       args.overlap, args.reconcile_fields, args.fill_gaps, args.compress)
+
+
+def report(key, fut):
+    folder, _, table = key
+    stamp = time.strftime("%H:%M:%S")
+    try:
+        status, log = fut.result()
+    except Exception as e:
+        status, log = "error", f"  ❌ Error: {e}\n"
+
+    print(f"[{stamp}] {os.path.basename(folder)} {table} → {status}")
+    if status not in QUIET_STATUSES:
+        print(log, end="")
+
+
+if __name__ == "__main__":
+    main()